@@ -210,6 +210,7 @@ export default function CanvasPredict() {
             <option value="logistic_regression">Logistic Regression</option>
             <option value="random_forest">Random Forest</option>
             <option value="neural_network">Neural Network</option>
+            <option value="ensemble">Ensemble (all models)</option>
           </select>
 
           <button
@@ -0,0 +1,35 @@
+# python-server/gunicorn.conf.py
+# Multi-worker serving: gunicorn -c gunicorn.conf.py src.main:app
+#
+# The app (and all models) is loaded once in the master process and the
+# workers are forked from it, so they share the model pages copy-on-write
+# instead of each holding a private copy.
+import gc
+import os
+import multiprocessing
+
+# Tell src.main to load the models synchronously while the app is preloaded
+os.environ.setdefault("MODELS_PRELOAD", "1")
+# Let every worker answer /api/metrics for all workers
+os.environ.setdefault("METRICS_MULTIPROCESS", "1")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = True
+
+def pre_fork(server, worker):
+    """Move everything loaded so far out of the garbage collector's reach, so
+    collections in the workers do not touch (and copy) the shared pages."""
+    gc.freeze()
+
+def post_fork(server, worker):
+    """Log how much memory the new worker holds on its own."""
+    from src.utils.model_store import memory_usage
+
+    usage = memory_usage()
+    if usage:
+        server.log.info(
+            f"Worker {worker.pid}: RSS {usage['rss_mb']:.0f} MB, "
+            f"unique {usage['unique_mb']:.0f} MB, shared {usage['shared_mb']:.0f} MB"
+        )
@@ -3,14 +3,18 @@ import os
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"  # 0=ALL,1=INFO,2=WARNING,3=ERROR
 os.environ["CUDA_VISIBLE_DEVICES"] = "-1"  # Disable GPUs for TensorFlow
 
-from .utils import DataProcessor, ModelTrainer, Predictor
-from .utils import (
-    get_gallery,
-    get_products,
-    add_product,
-    delete_product,
-    predict_number_from_request,
-    loader,
-    log
-)
+from . import utils
 
+# Same exports as src.utils, imported on first access
+__all__ = utils.__all__
+
+def __getattr__(name):
+    """Forward exports to src.utils, which imports them lazily (PEP 562)."""
+    if name in utils.__all__:
+        value = getattr(utils, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,353 @@
+import argparse
+import base64
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from src.utils.logger import log
+
+CANVAS_SIZE = 600   # Size of the drawing canvas on the Play page
+DIGIT_SIZE = 560    # The 28x28 digit is drawn at 20 px per pixel
+
+def load_digits(source: str, n: int, seed: int = 0) -> tuple:
+    """
+    Pick test digits to turn into canvas payloads.
+
+    Args:
+        source (str): 'mnist' (MNIST test set through Keras, as used for training)
+            or 'digits' (scikit-learn's bundled 8x8 digits, needs no download).
+        n (int): Number of digits.
+        seed (int): Random seed for the selection.
+
+    Returns:
+        tuple: (images as uint8 array (n, h, w), labels as int array (n,)).
+
+    Raises:
+        ImportError: If 'mnist' is requested without TensorFlow installed.
+    """
+    if source == "mnist":
+        from tensorflow.keras.datasets import mnist
+        (_, _), (images, labels) = mnist.load_data()
+    else:
+        from sklearn.datasets import load_digits as sklearn_digits
+        digits = sklearn_digits()
+        images = (digits.images * (255 / 16)).astype(np.uint8)
+        labels = digits.target
+
+    index = np.random.default_rng(seed).choice(len(images), size=min(n, len(images)), replace=False)
+    return images[index], labels[index].astype(int)
+
+def make_canvas_payload(digit: np.ndarray) -> str:
+    """
+    Draw a digit like the React Play page sends it.
+
+    The digit is upscaled to DIGIT_SIZE, pasted in the middle of a black
+    CANVAS_SIZE x CANVAS_SIZE RGBA canvas as white strokes and encoded as a
+    base64 PNG data URL (`canvas.toDataURL('image/png')`).
+
+    Args:
+        digit (np.ndarray): uint8 grayscale digit, white on black.
+
+    Returns:
+        str: PNG data URL.
+    """
+    strokes = Image.fromarray(digit).resize((DIGIT_SIZE, DIGIT_SIZE), Image.BILINEAR)
+    canvas = Image.new("RGBA", (CANVAS_SIZE, CANVAS_SIZE), (0, 0, 0, 255))
+    offset = (CANVAS_SIZE - DIGIT_SIZE) // 2
+    canvas.paste(Image.merge("RGBA", (strokes, strokes, strokes, Image.new("L", strokes.size, 255))),
+                 (offset, offset))
+
+    buffer = io.BytesIO()
+    canvas.save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+def summarize(timings: list) -> dict:
+    """
+    Summarize durations.
+
+    Args:
+        timings (list): Durations in seconds.
+
+    Returns:
+        dict: Count, mean, p50, p95, p99 and max in milliseconds.
+    """
+    ms = np.asarray(timings) * 1000
+    return {
+        "n": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+def _time_calls(fn, inputs: list, repeats: int) -> list:
+    """Call `fn` on every input `repeats` times and return the durations."""
+    fn(inputs[0])  # warm-up
+    timings = []
+    for _ in range(repeats):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+class StageRecorder:
+    """
+    Stand-in for the Metrics of a DataProcessor that keeps every stage duration.
+
+    DataProcessor times each of its steps through `metrics.time(stage)`, so
+    the stages are measured where the serving code runs them, and the raw
+    durations allow percentiles (Metrics only keeps histogram buckets).
+
+    Attributes:
+        timings (dict): Stage name -> list of durations in seconds.
+    """
+
+    def __init__(self):
+        """Initialize the StageRecorder with no timings."""
+        self.timings = defaultdict(list)
+
+    @contextmanager
+    def time(self, stage: str, **labels):
+        """
+        Time the body of a with-block as a stage.
+
+        Args:
+            stage (str): Stage name, e.g. "png_decode".
+            **labels: Ignored, accepted like `Metrics.time`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage].append(time.perf_counter() - start)
+
+def bench_stages(payloads: list, repeats: int) -> dict:
+    """
+    Time each DataProcessor stage, as the stages of full preprocessing runs.
+
+    Args:
+        payloads (list): PNG data URLs.
+        repeats (int): Passes over the payloads.
+
+    Returns:
+        dict: Stage name -> summary.
+    """
+    from src.utils.data_processor import DataProcessor
+
+    dp = DataProcessor()
+    images = [dp.decode_base64_image(p) for p in payloads]
+
+    results = {"preprocess_image": summarize(_time_calls(dp.preprocess_image, images, repeats))}
+
+    recorder = StageRecorder()
+    dp.metrics = recorder
+    total = _time_calls(lambda p: dp.preprocess_image(dp.decode_base64_image(p)), payloads, repeats)
+    # The first duration of every stage is the warm-up call
+    for stage, timings in recorder.timings.items():
+        results[stage] = summarize(timings[1:])
+    results["decode_and_preprocess"] = summarize(total)
+
+    for name, summary in results.items():
+        log(f"stage {name:<22} p50 {summary['p50_ms']:8.3f} ms  p99 {summary['p99_ms']:8.3f} ms",
+            caller="Benchmark", verbose=True)
+    return results
+
+def bench_end_to_end(payloads: list, models: list, repeats: int) -> dict:
+    """
+    Time `predict_number_from_request` for each model, batching on and cache off.
+
+    Args:
+        payloads (list): PNG data URLs.
+        models (list): Model names.
+        repeats (int): Passes over the payloads.
+
+    Returns:
+        dict: Model name -> summary.
+    """
+    from src.main import app, MODELS, SCHEDULERS
+    from src.utils.predict_number import predict_number_from_request
+
+    results = {}
+    with app.app_context():
+        for name in models:
+            # No label: nothing is written to the result logs
+            predict = lambda p: predict_number_from_request({"image": p, "model": name}, MODELS, SCHEDULERS)
+            results[name] = summarize(_time_calls(predict, payloads, repeats))
+            log(f"end-to-end {name:<20} p50 {results[name]['p50_ms']:8.3f} ms  "
+                f"p99 {results[name]['p99_ms']:8.3f} ms", caller="Benchmark", verbose=True)
+    return results
+
+def bench_load(payloads: list, model: str, concurrency: int, n_requests: int) -> dict:
+    """
+    Send concurrent POST /api/predict requests through the Flask test client.
+
+    Requests go through the whole app as configured, except that the
+    prediction cache is turned off for the run, so payloads repeated by the
+    round-robin are predicted again instead of measuring cache hits.
+
+    Args:
+        payloads (list): PNG data URLs, used round-robin.
+        model (str): Model name.
+        concurrency (int): Number of client threads.
+        n_requests (int): Total number of requests.
+
+    Returns:
+        dict: Latency summary plus throughput (requests/s) and failed requests.
+    """
+    import src.main as server
+    from src.main import app
+
+    def worker(indices):
+        client = app.test_client()
+        timings, failures = [], 0
+        for i in indices:
+            start = time.perf_counter()
+            response = client.post("/api/predict", json={"image": payloads[i % len(payloads)], "model": model})
+            timings.append(time.perf_counter() - start)
+            failures += response.status_code != 200
+        return timings, failures
+
+    chunks = [range(i, n_requests, concurrency) for i in range(concurrency)]
+    cache, server.PREDICTION_CACHE = server.PREDICTION_CACHE, None
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(worker, chunks))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.PREDICTION_CACHE = cache
+
+    timings = [t for chunk_timings, _ in outcomes for t in chunk_timings]
+    result = {
+        **summarize(timings),
+        "concurrency": concurrency,
+        "throughput_rps": n_requests / elapsed,
+        "failed": sum(failures for _, failures in outcomes),
+    }
+    log(f"load x{concurrency:<3} {result['throughput_rps']:8.1f} req/s  p50 {result['p50_ms']:8.3f} ms  "
+        f"p99 {result['p99_ms']:8.3f} ms  failed {result['failed']}", caller="Benchmark", verbose=True)
+    return result
+
+def _git_commit() -> str | None:
+    """Return the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous: dict, current: dict) -> None:
+    """
+    Print the p50/p99 change of every entry found in both results.
+
+    Args:
+        previous (dict): Earlier benchmark result.
+        current (dict): New benchmark result.
+    """
+    for section in ("stages", "end_to_end", "load"):
+        for name, summary in current.get(section, {}).items():
+            old = previous.get(section, {}).get(name)
+            if not old:
+                continue
+            changes = "  ".join(
+                f"{key[:-3]} {old[key]:.3f} -> {summary[key]:.3f} ms ({(summary[key] / old[key] - 1) * 100:+.0f}%)"
+                for key in ("p50_ms", "p99_ms") if old.get(key)
+            )
+            log(f"{section}/{name}: {changes}", caller="Benchmark", verbose=True)
+
+def main():
+    p = argparse.ArgumentParser(
+        description="Benchmark the prediction pipeline with canvas payloads built from test digits")
+    p.add_argument(
+        "-n",
+        type=int,
+        default=100,
+        help="Number of distinct payloads. Default is 100.")
+    p.add_argument(
+        "-r",
+        type=int,
+        default=3,
+        help="Passes over the payloads per stage and model. Default is 3.")
+    p.add_argument(
+        "--source",
+        choices=["mnist", "digits"],
+        default="mnist",
+        help="Digits to draw: MNIST test set (Keras) or scikit-learn's bundled 8x8 digits")
+    p.add_argument(
+        "--models",
+        nargs="+",
+        help="Models to run end to end. Default is all models.")
+    p.add_argument(
+        "--load-model",
+        default="logistic_regression",
+        help="Model used by the load generator. Default is logistic_regression.")
+    p.add_argument(
+        "-c",
+        type=int,
+        nargs="+",
+        default=[1, 4, 16],
+        help="Concurrency levels of the load generator. Default is 1 4 16.")
+    p.add_argument(
+        "--requests",
+        type=int,
+        default=500,
+        help="Requests per concurrency level. Default is 500.")
+    p.add_argument(
+        "-o",
+        type=Path,
+        help="Output JSON file. Default is logs/benchmark-<commit>.json")
+    p.add_argument(
+        "--compare",
+        type=Path,
+        help="Earlier result file to compare against")
+    args = p.parse_args()
+
+    images, _ = load_digits(args.source, args.n)
+    payloads = [make_canvas_payload(image) for image in images]
+    log(f"Built {len(payloads)} canvas payloads from {args.source}", caller="Benchmark", verbose=True)
+
+    from src.main import MODELS
+    MODELS.warm_up(background=False)
+    models = args.models or list(MODELS)
+
+    commit = _git_commit()
+    result = {
+        "meta": {
+            "commit": commit,
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "cpus": os.cpu_count(),
+            "args": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        },
+        "stages": bench_stages(payloads, args.r),
+        "end_to_end": bench_end_to_end(payloads, models, args.r),
+        "load": {str(c): bench_load(payloads, args.load_model, c, args.requests) for c in args.c},
+        # Linux reports KB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+    output = args.o or Path("logs") / f"benchmark-{commit or datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    log(f"Peak RSS {result['peak_rss_mb']:.0f} MB, results written to {output}", caller="Benchmark", verbose=True)
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), result)
+
+if __name__ == "__main__":
+    main()
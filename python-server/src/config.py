@@ -1,2 +1,70 @@
 # src/config.py
+import os
+
 VERBOSE = False
+
+# Load all models in the background at startup instead of on first use
+MODELS_WARM_UP = True
+
+# Load all models synchronously before worker processes are forked, so they
+# share the model pages copy-on-write (set by gunicorn.conf.py)
+MODELS_PRELOAD = os.environ.get("MODELS_PRELOAD") == "1"
+
+# Memory-map the compiled forest from models/store when available (see utils/model_store.py)
+MODELS_MMAP = True
+
+# Versioned models in models/versions (see utils/model_registry.py)
+MODELS_WATCH_INTERVAL = 10.0        # Seconds between checks for new versions, 0 disables the watcher
+
+# Micro-batching of /api/predict requests (see utils/batching.py)
+BATCH_MAX_SIZE = 32     # Maximum number of rows per forward pass
+BATCH_MAX_WAIT_MS = 2   # Maximum time to wait for a batch to fill up
+
+# Debug image capture (see utils/debug_capture.py)
+DEBUG_CAPTURE = False               # Save processed images of sampled requests to images/
+DEBUG_CAPTURE_SAMPLE_RATE = 100     # Capture 1 in N requests
+DEBUG_CAPTURE_BUFFER_SIZE = 64      # Captures waiting to be written, more are dropped
+
+# Cache of recent predictions (see utils/prediction_cache.py)
+PREDICTION_CACHE_SIZE = 1024        # Maximum number of cached predictions
+PREDICTION_CACHE_TTL = 300          # Seconds before a cached prediction expires
+
+# Ensemble prediction (model "ensemble" on /api/predict)
+ENSEMBLE_WEIGHTS = {}               # Weight per model name, missing models get 1.0
+
+# Latency histograms served on /api/metrics (see utils/metrics.py)
+METRICS_ENABLED = True
+METRICS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+METRICS_MULTIPROCESS = os.environ.get("METRICS_MULTIPROCESS") == "1"  # Add up all workers (set by gunicorn.conf.py)
+METRICS_DIR = "./logs/metrics"      # Per-process snapshots when METRICS_MULTIPROCESS is set
+METRICS_SNAPSHOT_INTERVAL = 5.0     # Seconds between snapshots
+
+# Prediction result files logs/<model>_result.log (see utils/result_sink.py)
+RESULT_SINK_FLUSH_LINES = 64        # Write when this many lines are pending
+RESULT_SINK_FLUSH_INTERVAL = 1.0    # Seconds a line may wait before it is written
+RESULT_SINK_MAX_BYTES = 10 * 1024 * 1024  # Rotate result files at this size
+RESULT_SINK_BACKUP_COUNT = 5        # Rotated files kept per model
+RESULT_SINK_PER_PROCESS = False     # One file per worker process, merge with merge_result_logs()
+RESULT_SINK_BACKEND = "sqlite"      # "sqlite" (PREDICTION_STORE_PATH) or "text" (the result files above)
+
+# SQLite connections to the databases in data/db (see utils/db_pool.py)
+DB_POOL_SIZE = 8                    # Idle connections kept per database and mode
+DB_MMAP_SIZE = 64 * 1024 * 1024     # Bytes of each database read through a memory map
+DB_CACHE_KIB = 8192                 # Page cache per connection in KiB
+DB_BUSY_TIMEOUT = 5.0               # Seconds to wait for a lock held by another connection
+DB_CACHED_STATEMENTS = 64           # Prepared statements kept per connection
+
+# In-memory copies of the products and gallery tables (see utils/catalog.py)
+CATALOG_CHECK_INTERVAL = 0.0        # Seconds between checks for writes by other processes, 0 checks every read
+
+# Keyset pagination and streaming of /api/products and /api/gallery
+PAGE_DEFAULT_LIMIT = 50             # Entries per page without a limit parameter
+PAGE_MAX_LIMIT = 200                # Largest accepted page size
+STREAM_FETCH_SIZE = 500             # Rows fetched from SQLite per chunk of a streamed list
+
+# Product search on /api/products?q= (see utils/db_utils.py)
+SEARCH_DEFAULT_LIMIT = 50           # Matches returned without a limit parameter
+SEARCH_MAX_LIMIT = 200              # Largest accepted limit
+
+# Prediction results with running accuracy and confusion counters (see utils/prediction_store.py)
+PREDICTION_STORE_PATH = "./data/db/predictions.db"
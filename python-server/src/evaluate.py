@@ -0,0 +1,286 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.logger import log
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+# Per-process state of the pool workers, set by _init_worker
+_worker = {}
+
+def _init_worker(model_names: list, canvas: bool, models_dir: str) -> None:
+    """Load the models once per worker process."""
+    from src.utils.data_processor import DataProcessor
+    from src.utils.model_registry import ModelRegistry
+
+    models = ModelRegistry(models_dir, verbose=False)
+    _worker["models"] = {name: models[name] for name in model_names}
+    _worker["versions"] = {name: models.version(name) for name in model_names}
+    _worker["dp"] = DataProcessor(verbose=False)
+    _worker["canvas"] = canvas
+
+def _evaluate_batch(batch: tuple) -> dict:
+    """
+    Preprocess one batch with DataProcessor and predict it with every model.
+
+    Args:
+        batch (tuple): (inputs, labels), inputs are 2D uint8 arrays or image file paths.
+
+    Returns:
+        dict: Labels and predicted probabilities of the usable rows, number of
+              skipped (empty) images and the time spent per step.
+    """
+    from src.utils.predict import Predictor
+
+    inputs, labels = batch
+    dp = _worker["dp"]
+    if _worker["canvas"]:
+        from src.benchmark import make_canvas_payload
+        inputs = [make_canvas_payload(image) for image in inputs]
+    elif inputs and isinstance(inputs[0], str):
+        inputs = [Path(path).read_bytes() for path in inputs]
+    labels = np.asarray(labels)
+
+    start = time.perf_counter()
+    try:
+        data = dp.preprocess_batch(inputs)
+        keep = np.ones(len(inputs), dtype=bool)
+    except ValueError:
+        # An empty canvas fails the whole batch, preprocess row by row to skip only those
+        rows = []
+        for item in inputs:
+            try:
+                rows.append(dp.preprocess_batch([item])[0])
+            except ValueError:
+                rows.append(None)
+        keep = np.array([row is not None for row in rows])
+        data = np.stack([row for row in rows if row is not None]) if keep.any() else np.empty((0, 784), np.float32)
+    timings = {"preprocess": time.perf_counter() - start}
+
+    probabilities = {}
+    for name, model in _worker["models"].items():
+        start = time.perf_counter()
+        probabilities[name] = Predictor.predict_batch(model, data) if len(data) else np.empty((0, 10))
+        timings[name] = time.perf_counter() - start
+
+    return {
+        "labels": labels[keep],
+        "probabilities": probabilities,
+        "skipped": int((~keep).sum()),
+        "timings": timings,
+        "versions": _worker["versions"],
+    }
+
+def load_dataset(source: str, limit: int = None) -> tuple:
+    """
+    Load the test digits as 28x28 uint8 arrays.
+
+    Args:
+        source (str): 'mnist' (MNIST test set through Keras) or 'digits'
+            (scikit-learn's bundled 8x8 digits, needs no download).
+        limit (int, optional): Only use the first `limit` digits.
+
+    Returns:
+        tuple: (images (N, h, w) uint8, labels (N,) int).
+    """
+    if source == "mnist":
+        from tensorflow.keras.datasets import mnist
+        (_, _), (images, labels) = mnist.load_data()
+    else:
+        from sklearn.datasets import load_digits
+        digits = load_digits()
+        images = (digits.images * (255 / 16)).astype(np.uint8)
+        labels = digits.target
+    return images[:limit], labels[:limit].astype(int)
+
+def find_images(directory: Path, limit: int = None) -> tuple:
+    """
+    Find saved canvases and their labels.
+
+    The label is taken from a parent directory named after the digit
+    (`<dir>/7/canvas.png`) or a leading digit in the file name (`7_canvas.png`).
+    Images without a label are predicted but not counted in the accuracy.
+
+    Args:
+        directory (Path): Directory searched recursively.
+        limit (int, optional): Only use the first `limit` images.
+
+    Returns:
+        tuple: (paths as str, labels with -1 for unlabeled images).
+    """
+    paths = sorted(p for p in Path(directory).rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)[:limit]
+    labels = []
+    for path in paths:
+        if path.parent.name.isdigit() and len(path.parent.name) == 1:
+            labels.append(int(path.parent.name))
+        elif path.name[0].isdigit() and (len(path.stem) == 1 or not path.stem[1].isdigit()):
+            labels.append(int(path.name[0]))
+        else:
+            labels.append(-1)
+    return [str(p) for p in paths], np.array(labels, dtype=int)
+
+def _batches(inputs, labels: np.ndarray, batch_size: int):
+    """Yield (inputs, labels) batches lazily, so the pool starts before all batches exist."""
+    for start in range(0, len(labels), batch_size):
+        yield list(inputs[start:start + batch_size]), labels[start:start + batch_size].tolist()
+
+def evaluate(inputs, labels: np.ndarray, model_names: list, batch_size: int = 256,
+             workers: int = None, canvas: bool = False, models_dir: Path = None) -> dict:
+    """
+    Run inputs through DataProcessor and every model on a process pool.
+
+    Batches are streamed to the workers and the results are aggregated as they
+    arrive, so memory use does not grow with the dataset.
+
+    Args:
+        inputs: 2D uint8 arrays or image file paths.
+        labels (np.ndarray): Label per input, -1 for unlabeled.
+        model_names (list): Models to evaluate.
+        batch_size (int): Inputs per task.
+        workers (int, optional): Worker processes. Defaults to the number of CPUs.
+        canvas (bool): Draw array inputs on a Play-page canvas and decode them as PNGs.
+        models_dir (Path, optional): Models directory. Defaults to models/, newest versions.
+
+    Returns:
+        dict: Accuracy, confusion matrix and per-sample latency per model
+              (plus 'ensemble', weighted with ENSEMBLE_WEIGHTS like /api/predict).
+    """
+    from src.config import ENSEMBLE_WEIGHTS
+    from src.utils.models import MODELS_DIR
+
+    workers = workers or os.cpu_count()
+    weights = {name: ENSEMBLE_WEIGHTS.get(name, 1.0) for name in model_names}
+    names = list(model_names) + (["ensemble"] if len(model_names) > 1 else [])
+    confusion = {name: np.zeros((10, 10), dtype=np.int64) for name in names}
+    seconds = {name: 0.0 for name in ["preprocess", *model_names]}
+    samples = skipped = 0
+    versions = {}
+
+    start = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(
+            workers, _init_worker, (list(model_names), canvas, str(models_dir or MODELS_DIR))) as pool:
+        for result in pool.imap_unordered(_evaluate_batch, _batches(inputs, labels, batch_size)):
+            batch_labels = result["labels"]
+            probabilities = dict(result["probabilities"])
+            if len(model_names) > 1:
+                probabilities["ensemble"] = sum(weights[name] * p / p.sum(axis=1, keepdims=True)
+                                                for name, p in result["probabilities"].items())
+
+            labeled = batch_labels >= 0
+            for name, p in probabilities.items():
+                digits = p.argmax(axis=1)
+                np.add.at(confusion[name], (batch_labels[labeled], digits[labeled]), 1)
+
+            for step, elapsed in result["timings"].items():
+                seconds[step] += elapsed
+            samples += len(batch_labels)
+            skipped += result["skipped"]
+            versions = result["versions"]
+            log(f"{samples + skipped}/{len(labels)} images", caller="Evaluate", verbose=True)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "samples": samples,
+        "skipped": skipped,
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "throughput_per_s": (samples + skipped) / elapsed if elapsed else 0.0,
+        "preprocess_ms_per_sample": seconds["preprocess"] * 1000 / max(samples + skipped, 1),
+        "models": {},
+    }
+    for name in names:
+        matrix = confusion[name]
+        labeled = int(matrix.sum())
+        report["models"][name] = {
+            "version": versions.get(name),
+            "accuracy": float(np.trace(matrix) / labeled) if labeled else None,
+            "labeled": labeled,
+            "inference_ms_per_sample": seconds[name] * 1000 / max(samples, 1) if name in seconds else None,
+            "confusion_matrix": matrix.tolist(),
+        }
+    return report
+
+def print_report(report: dict) -> None:
+    """Log accuracy, latency and the confusion matrix of every model."""
+    log(f"{report['samples']} samples ({report['skipped']} empty skipped) in {report['elapsed_s']:.1f} s "
+        f"on {report['workers']} workers, {report['throughput_per_s']:.0f} samples/s, "
+        f"preprocessing {report['preprocess_ms_per_sample']:.3f} ms/sample", caller="Evaluate", verbose=True)
+    for name, result in report["models"].items():
+        accuracy = "n/a" if result["accuracy"] is None else f"{result['accuracy']:.4f}"
+        latency = "" if result["inference_ms_per_sample"] is None else \
+            f", inference {result['inference_ms_per_sample']:.3f} ms/sample"
+        log(f"{name}: accuracy {accuracy} on {result['labeled']} labeled samples{latency}",
+            caller="Evaluate", verbose=True)
+        log("true\\pred " + " ".join(f"{d:>5}" for d in range(10)), caller="Evaluate", verbose=True)
+        for digit, row in enumerate(result["confusion_matrix"]):
+            log(f"{digit:>9} " + " ".join(f"{count:>5}" for count in row), caller="Evaluate", verbose=True)
+
+def main():
+    p = argparse.ArgumentParser(
+        description="Evaluate the models on test digits through the serving preprocessing")
+    p.add_argument(
+        "--source",
+        choices=["mnist", "digits"],
+        default="mnist",
+        help="Test set: MNIST (Keras) or scikit-learn's bundled 8x8 digits. Ignored with --dir")
+    p.add_argument(
+        "--dir",
+        type=Path,
+        help="Directory of saved canvases, labeled by a digit folder or file name prefix")
+    p.add_argument(
+        "--canvas",
+        action="store_true",
+        help="Draw test digits on a Play-page canvas and decode them from PNG, like real requests")
+    p.add_argument(
+        "--models",
+        nargs="+",
+        help="Models to evaluate. Default is all models.")
+    p.add_argument(
+        "-n",
+        type=int,
+        help="Only use the first N images")
+    p.add_argument(
+        "-b",
+        type=int,
+        default=256,
+        help="Images per batch. Default is 256.")
+    p.add_argument(
+        "-w",
+        type=int,
+        help="Worker processes. Default is the number of CPUs.")
+    p.add_argument(
+        "--models-dir",
+        type=Path,
+        help="Models directory. Default is models/ (newest published versions)")
+    p.add_argument(
+        "-o",
+        type=Path,
+        help="Write the report as JSON to this file")
+    args = p.parse_args()
+
+    from src.utils.model_registry import MODEL_FILES
+    model_names = args.models or list(MODEL_FILES)
+
+    if args.dir:
+        inputs, labels = find_images(args.dir, args.n)
+    else:
+        inputs, labels = load_dataset(args.source, args.n)
+    log(f"Evaluating {model_names} on {len(labels)} images", caller="Evaluate", verbose=True)
+
+    report = evaluate(inputs, labels, model_names, batch_size=args.b, workers=args.w,
+                      canvas=args.canvas and not args.dir, models_dir=args.models_dir)
+    print_report(report)
+
+    if args.o:
+        args.o.parent.mkdir(parents=True, exist_ok=True)
+        args.o.write_text(json.dumps(report, indent=2))
+        log(f"Report written to {args.o}", caller="Evaluate", verbose=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import argparse
+import multiprocessing
+import resource
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.numpy_mlp import NumpyMLP
+from src.utils.compiled_forest import CompiledForest
+from src.utils.linear_model import LinearSoftmax
+from src.utils.logger import log
+
+MODELS_DIR = Path(__file__).resolve().parent.parent / "models"
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _probe(engine: str, repeats: int) -> dict:
+    """
+    Load one engine in a fresh process and time single-row predictions.
+
+    Runs in a spawned child so the peak RSS only contains what that engine needs.
+
+    Args:
+        engine (str): 'numpy' or 'keras' (MLP), 'compiled' or 'sklearn-rf' (RandomForest),
+            'linear' or 'sklearn-lr' (LogisticRegression).
+        repeats (int): Number of timed predictions.
+
+    Returns:
+        dict: Median latency in ms and peak RSS in MB.
+    """
+    if engine == "numpy":
+        model = NumpyMLP.load(MODELS_DIR / "NeuralNetwork.npz")
+        predict = model.predict
+    elif engine == "compiled":
+        model = CompiledForest.load("RandomForest", MODELS_DIR / "store")
+        predict = model.predict_proba
+    elif engine == "linear":
+        model = LinearSoftmax.load(MODELS_DIR / "LogisticRegression.npz")
+        predict = model.predict_proba
+    elif engine in ("sklearn-rf", "sklearn-lr"):
+        import joblib
+        name = "RandomForest" if engine == "sklearn-rf" else "LogisticRegression"
+        model = joblib.load(MODELS_DIR / f"{name}.joblib")
+        predict = model.predict_proba
+    else:
+        from tensorflow.keras.models import load_model as keras_load_model
+        model = keras_load_model(MODELS_DIR / "NeuralNetwork.h5", compile=False)
+        predict = lambda data: model.predict(data, verbose=0)
+
+    data = np.random.default_rng(0).random((1, 784), dtype=np.float32)
+    predict(data)  # warm-up
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(data)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {"latency_ms": float(np.median(timings)), "peak_rss_mb": _peak_rss_mb()}
+
+def benchmark(engines: tuple, repeats: int = 200) -> dict:
+    """
+    Compare single-row latency and peak RSS of exported and original engines.
+
+    Args:
+        engines (tuple): Engine names, see `_probe`.
+        repeats (int): Number of timed predictions per engine.
+
+    Returns:
+        dict: Probe results keyed by engine.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for engine in engines:
+        with ctx.Pool(1) as pool:
+            results[engine] = pool.apply(_probe, (engine, repeats))
+        log(f"{engine:>10}: {results[engine]['latency_ms']:.3f} ms/prediction, "
+            f"peak RSS {results[engine]['peak_rss_mb']:.0f} MB", caller="Export", verbose=True)
+    return results
+
+def export_mlp(check: bool = True, atol: float = 1e-5) -> Path:
+    """
+    Export NeuralNetwork.h5 to a float32 NeuralNetwork.npz for TensorFlow-free serving.
+
+    Args:
+        check (bool): If True, verify the NumPy outputs against Keras.
+        atol (float): Maximum allowed absolute difference in probabilities.
+
+    Returns:
+        Path: Path to the exported `.npz` file.
+
+    Raises:
+        RuntimeError: If the parity check fails.
+    """
+    from tensorflow.keras.models import load_model as keras_load_model
+
+    keras_model = keras_load_model(MODELS_DIR / "NeuralNetwork.h5", compile=False)
+    npz_path = NumpyMLP.from_keras(keras_model).save(MODELS_DIR / "NeuralNetwork.npz")
+    log(f"Exported NeuralNetwork weights to {npz_path}", caller="Export", verbose=True)
+
+    if check:
+        # Reload from disk so the check covers the saved file, not the in-memory copy
+        numpy_model = NumpyMLP.load(npz_path)
+        rng = np.random.default_rng(42)
+        data = np.vstack([
+            np.zeros((1, 784), dtype=np.float32),
+            rng.random((999, 784), dtype=np.float32),
+        ])
+        expected = keras_model.predict(data, verbose=0)
+        actual = numpy_model.predict(data)
+        max_diff = float(np.max(np.abs(expected - actual)))
+        log(f"Max abs difference NumPy vs Keras: {max_diff:.2e}", caller="Export", verbose=True)
+        if max_diff > atol:
+            raise RuntimeError(f"NumPy export differs from Keras by {max_diff} (> {atol})")
+        if not np.array_equal(expected.argmax(axis=1), actual.argmax(axis=1)):
+            raise RuntimeError("Predicted digits differ")
+
+    return npz_path
+
+def export_forest(check: bool = True) -> Path:
+    """
+    Compile RandomForest.joblib into flat node arrays in models/store/RandomForest.
+
+    Args:
+        check (bool): If True, verify the compiled forest predicts exactly like sklearn.
+
+    Returns:
+        Path: Path to the compiled forest directory.
+
+    Raises:
+        RuntimeError: If the parity check fails.
+    """
+    import joblib
+
+    forest = joblib.load(MODELS_DIR / "RandomForest.joblib")
+    path = CompiledForest.from_sklearn(forest).save("RandomForest", MODELS_DIR / "store")
+    log(f"Compiled RandomForest to {path}", caller="Export", verbose=True)
+
+    if check:
+        # Sum the trees in order on one thread, the order the compiled forest uses
+        forest.n_jobs = 1
+        compiled = CompiledForest.load("RandomForest", MODELS_DIR / "store")
+        rng = np.random.default_rng(42)
+        data = np.vstack([
+            np.zeros((1, 784), dtype=np.float32),
+            rng.random((999, 784), dtype=np.float32),
+        ])
+        if not np.array_equal(forest.predict_proba(data), compiled.predict_proba(data)):
+            raise RuntimeError("Compiled RandomForest predicts differently")
+        if not np.array_equal(forest.predict_proba(data[:1]), compiled.predict_proba(data[:1])):
+            raise RuntimeError("Compiled RandomForest predicts differently on a single row")
+        log("Compiled RandomForest matches sklearn", caller="Export", verbose=True)
+
+    return path
+
+def export_linear(check: bool = True, atol: float = 1e-5) -> Path:
+    """
+    Export LogisticRegression.joblib to a float32 LogisticRegression.npz for sklearn-free serving.
+
+    Args:
+        check (bool): If True, verify the NumPy outputs against sklearn.
+        atol (float): Maximum allowed absolute difference in probabilities.
+
+    Returns:
+        Path: Path to the exported `.npz` file.
+
+    Raises:
+        RuntimeError: If the parity check fails.
+    """
+    import joblib
+
+    model = joblib.load(MODELS_DIR / "LogisticRegression.joblib")
+    npz_path = LinearSoftmax.from_sklearn(model).save(MODELS_DIR / "LogisticRegression.npz")
+    log(f"Exported LogisticRegression coefficients to {npz_path}", caller="Export", verbose=True)
+
+    if check:
+        linear = LinearSoftmax.load(npz_path)
+        rng = np.random.default_rng(42)
+        data = np.vstack([
+            np.zeros((1, 784), dtype=np.float32),
+            rng.random((999, 784), dtype=np.float32),
+        ])
+        expected = model.predict_proba(data)
+        actual = linear.predict_proba(data)
+        max_diff = float(np.max(np.abs(expected - actual)))
+        log(f"Max abs difference NumPy vs sklearn: {max_diff:.2e}", caller="Export", verbose=True)
+        if max_diff > atol:
+            raise RuntimeError(f"NumPy export differs from sklearn by {max_diff} (> {atol})")
+        if not np.array_equal(model.predict(data), linear.predict(data)):
+            raise RuntimeError("Predicted digits differ")
+
+    return npz_path
+
+def main():
+    p = argparse.ArgumentParser(
+        description="Export trained models to lean inference formats")
+    p.add_argument(
+        "-m",
+        choices=["LR", "RF", "MLP"],
+        default="MLP",
+        help="Model to export: LR (Logistic Regression to NumPy .npz), "
+             "RF (compiled node arrays in models/store), MLP (Neural Net to NumPy .npz)")
+    p.add_argument(
+        "--no-check",
+        action="store_true",
+        help="Skip the parity check against the original model")
+    p.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Compare latency and peak RSS of the exported and original model")
+    p.add_argument(
+        "-r",
+        type=int,
+        default=200,
+        help="Number of timed predictions in the benchmark. Default is 200.")
+    args = p.parse_args()
+
+    if args.m == "MLP":
+        export_mlp(check=not args.no_check)
+        if args.benchmark:
+            benchmark(("numpy", "keras"), repeats=args.r)
+    elif args.m == "RF":
+        export_forest(check=not args.no_check)
+        if args.benchmark:
+            benchmark(("compiled", "sklearn-rf"), repeats=args.r)
+    else:
+        export_linear(check=not args.no_check)
+        if args.benchmark:
+            benchmark(("linear", "sklearn-lr"), repeats=args.r)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,31 @@
 import os
-import random
+import json
 import logging
-from flask import Flask, jsonify, request
+import time
+
+# Time the heavy imports one by one for the startup report
+from src.utils.startup import STARTUP
+STARTUP.import_modules(
+    "numpy", "flask", "dotenv", "PIL.Image",
+    "src.utils.predict_number", "src.utils.db_utils", "src.utils.models"
+)
+
+from flask import Flask, Response, g, jsonify, request
 from dotenv import load_dotenv
 
 from src.utils.logger import log
-from src.config import VERBOSE
-from src import loader, predict_number_from_request, get_gallery, get_products, delete_product
+from src.config import VERBOSE, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, MODELS_WARM_UP, MODELS_PRELOAD
+from src.config import MODELS_WATCH_INTERVAL
+from src.config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+from src.config import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT
+from src.config import PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT, STREAM_FETCH_SIZE
+from src import ModelRegistry, predict_number_from_request, get_catalog, delete_product
+from src import get_max_product_id, add_product, search_products, get_page, iter_entries
+from src import BatchScheduler, Predictor, PredictionCache
+from src.utils.model_store import memory_usage
+from src.utils.metrics import get_metrics
+from src.utils.catalog import ENCODINGS
+from src.utils.prediction_store import get_prediction_store
 
 # Suppress Flask's default logging to keep the output clean
 logging.getLogger("werkzeug").setLevel(logging.ERROR)
@@ -19,8 +38,37 @@ app = Flask(__name__)
 # --------------------------------------------------
 # Load ML models
 # --------------------------------------------------
-MODELS = {}
-loader(MODELS, verbose=True)
+# Each model is loaded on first use (newest version in models/versions),
+# warm-up loads them in the background. When preloading for forked workers,
+# load them now so no loader thread is running when the workers are forked.
+MODELS = ModelRegistry(verbose=True)
+if MODELS_PRELOAD:
+    MODELS.warm_up(background=False)
+elif MODELS_WARM_UP:
+    MODELS.warm_up(background=True)
+else:
+    STARTUP.log_report(verbose=True)
+
+# One batching scheduler per model, concurrent requests share a forward pass
+SCHEDULERS = {
+    name: BatchScheduler(
+        Predictor.predict_batch,
+        max_batch_size=BATCH_MAX_SIZE,
+        max_wait_ms=BATCH_MAX_WAIT_MS,
+        name=name
+    )
+    for name in MODELS
+}
+
+# Repeated canvases are answered from the cache
+PREDICTION_CACHE = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL)
+
+# Products and gallery are served from memory, reloaded when the tables change
+PRODUCTS = get_catalog("products")
+GALLERY = get_catalog("gallery")
+
+# Per-route and per-stage latency histograms, served on /api/metrics
+METRICS = get_metrics()
 
 # --------------------------------------------------
 # Load environment variables
@@ -45,6 +93,97 @@ DB_PATH = os.path.join(DB_FOLDER, "shop.db")
 # --------------------------------------------------
 # Routes
 # --------------------------------------------------
+@app.before_request
+def watch_models():
+    """Make sure this worker process watches for new model versions."""
+    MODELS.watch(MODELS_WATCH_INTERVAL)
+
+@app.before_request
+def start_timer():
+    """Label this request's timings with its route and start the request timer."""
+    METRICS.set_route(request.url_rule.rule if request.url_rule else "unmatched")
+    g.start_time = time.perf_counter()
+
+@app.after_request
+def record_duration(response):
+    """Record how long the request took per route, method and status."""
+    if "start_time" in g:
+        METRICS.observe("http_request_seconds", time.perf_counter() - g.start_time,
+                        method=request.method, status=str(response.status_code))
+    return response
+
+def catalog_response(snapshot) -> Response:
+    """
+    Send a catalog snapshot as pre-encoded JSON, or 304 if the client has it.
+
+    The body is compressed with the best encoding the client accepts and
+    carries a strong ETag, a request with a matching If-None-Match gets an
+    empty 304.
+
+    Args:
+        snapshot (CatalogSnapshot): Snapshot to send.
+
+    Returns:
+        Response: 200 with the encoded body or 304.
+    """
+    cached = next((e for e in ENCODINGS if request.if_none_match.contains(snapshot.etag(e))), None)
+    if cached is not None:
+        response = Response(status=304)
+        encoding = cached
+    else:
+        accepted = request.accept_encodings
+        encoding = next((e for e in ENCODINGS if e == "identity" or accepted[e]), "identity")
+        response = Response(snapshot.body(encoding), mimetype="application/json")
+        if encoding != "identity":
+            response.content_encoding = encoding
+
+    response.set_etag(snapshot.etag(encoding))
+    response.vary.add("Accept-Encoding")
+    # Cached by the browser, but revalidated on every use
+    response.cache_control.no_cache = True
+    return response
+
+def list_response(db_name: str, catalog) -> Response:
+    """
+    Send a product or gallery list as a page, a stream or the cached full list.
+
+    - `after_id` and/or `limit`: one page of at most PAGE_MAX_LIMIT entries after
+      the id `after_id`, as `{"items": [...], "next_after_id": id | null}`.
+    - `stream=1`: all entries after `after_id` as a JSON array, written while
+      the rows are read from SQLite, so the list is never held in memory.
+    - Otherwise the whole list from the catalog (see catalog_response).
+
+    Args:
+        db_name (str): 'products' or 'gallery'.
+        catalog (Catalog): Catalog of the same table.
+
+    Returns:
+        Response: JSON response.
+    """
+    after_id = max(request.args.get("after_id", 0, type=int), 0)
+
+    if request.args.get("stream") == "1":
+        def chunks():
+            yield "["
+            first = True
+            for entries in iter_entries(db_name, after_id, fetch_size=STREAM_FETCH_SIZE):
+                body = ",".join(json.dumps(entry, separators=(",", ":")) for entry in entries)
+                yield body if first else "," + body
+                first = False
+            yield "]"
+        return Response(chunks(), mimetype="application/json")
+
+    if "after_id" in request.args or "limit" in request.args:
+        limit = min(max(request.args.get("limit", PAGE_DEFAULT_LIMIT, type=int), 1), PAGE_MAX_LIMIT)
+        items = get_page(db_name, after_id, limit)
+        return jsonify({
+            "items": items,
+            # A full page may be followed by more entries
+            "next_after_id": items[-1]["id"] if len(items) == limit else None,
+        })
+
+    return catalog_response(catalog.snapshot())
+
 @app.route("/")
 def health():
     """Health check route. Returns server status."""
@@ -52,61 +191,120 @@ def health():
 
 @app.route("/api/predict", methods=["POST"])
 def predict():
-    """Predict digit from base64 image payload."""
+    """
+    Predict digit from an image payload.
+
+    Accepts a JSON body (base64 PNG `image` or `pixels` array) or a raw
+    application/octet-stream uint8 grayscale frame with `model`, `label`,
+    `width` and `height` as query parameters.
+    """
     log("/api/predict called", caller="App", verbose=VERBOSE)
-    # Get the JSON data from the request
+    if request.mimetype == "application/octet-stream":
+        # Raw frame, no JSON or base64 parsing needed
+        data = {
+            "frame": request.get_data(cache=False),
+            "width": request.args.get("width", type=int),
+            "height": request.args.get("height", type=int),
+            "model": request.args.get("model", "logistic_regression"),
+            "label": request.args.get("label", type=int),
+        }
+    else:
+        # Get the JSON data from the request
+        data = request.get_json(silent=True) or {}
+    return predict_number_from_request(data, MODELS, SCHEDULERS, cache=PREDICTION_CACHE)
+
+@app.route("/api/predict/stats")
+def api_predict_stats():
+    """Return batching counters for each model and prediction cache counters."""
+    log("/api/predict/stats called", caller="App", verbose=VERBOSE)
+    return jsonify({
+        "batching": {name: scheduler.stats() for name, scheduler in SCHEDULERS.items()},
+        "cache": PREDICTION_CACHE.stats(),
+    })
+
+@app.route("/api/predictions/stats")
+def api_predictions_stats():
+    """Return the running accuracy and confusion matrix of each model from the prediction store."""
+    log("/api/predictions/stats called", caller="App", verbose=VERBOSE)
+    return jsonify(get_prediction_store().aggregates())
+
+@app.route("/api/models")
+def api_models():
+    """Return the active, latest and available versions of each model."""
+    log("/api/models called", caller="App", verbose=VERBOSE)
+    return jsonify(MODELS.status())
+
+@app.route("/api/models/reload", methods=["POST"])
+def api_models_reload():
+    """
+    Load the newest (or a given) model version in the background and swap it in.
+
+    Expects the admin `username` and `password`, and optionally `model` and
+    `version` (to roll back to an older version). Only reloads the worker
+    process that serves the request, the others follow through their watcher.
+    """
     data = request.get_json(silent=True) or {}
-    return predict_number_from_request(data, MODELS)
+    log("/api/models/reload called", caller="App", verbose=VERBOSE)
+    if not ADMIN_USER or data.get("username") != ADMIN_USER or data.get("password") != ADMIN_PASS:
+        return jsonify({"success": False, "error": "Invalid username or password"}), 401
+
+    try:
+        scheduled = MODELS.reload(data.get("model"), data.get("version"))
+    except KeyError:
+        return jsonify({"error": f"Unknown model '{data.get('model')}'"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"success": True, "reloading": scheduled}), 202
+
+@app.route("/api/metrics")
+def api_metrics():
+    """Return the latency histograms of all worker processes in Prometheus text format."""
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/memory")
+def api_memory():
+    """Return resident memory of the worker process that serves the request."""
+    log("/api/memory called", caller="App", verbose=VERBOSE)
+    usage = memory_usage()
+    if usage is None:
+        return jsonify({"error": "Memory usage is only available on Linux"}), 501
+    return jsonify(usage)
 
 @app.route("/api/gallery")
 def api_gallery():
-    """Return all gallery entries."""
+    """Return all gallery entries, a page or a stream of them (see list_response)."""
     log("/api/gallery called", caller="App", verbose=VERBOSE)
-    return jsonify(get_gallery())
+    return list_response("gallery", GALLERY)
 
 @app.route("/api/products")
 def api_products():
-    """Return all products or filtered products if query 'q' is provided."""
+    """
+    Return all products, a page or a stream of them (see list_response),
+    or the best matches if query 'q' is provided.
+
+    Matches are paginated with 'limit' (at most SEARCH_MAX_LIMIT) and 'offset'.
+    """
     log("/api/products called", caller="App", verbose=VERBOSE)
-    q = request.args.get("q", "").strip().lower()
-    products = get_products()
+    q = request.args.get("q", "").strip()
 
     if not q:
-        return jsonify(products)
+        return list_response("products", PRODUCTS)
 
-    filtered = []
+    limit = min(max(request.args.get("limit", SEARCH_DEFAULT_LIMIT, type=int), 0), SEARCH_MAX_LIMIT)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    matches = search_products(q, limit=limit, offset=offset)
 
-    for p in products:
-        text_match = (
-            q in p["name"].lower()
-            or q in p["brand"].lower()
-            or q in p["description"].lower()
-        )
-
-        number_match = False
-        if q.isdigit():
-            number = int(q)
-            number_match = (
-                p.get("id") == number
-                or p.get("price") == number
-            )
-
-        if text_match or number_match:
-            filtered.append(p)
-            log(f"Matched product: {p['name']} (id={p['id']})", caller="App", verbose=VERBOSE)
-
-    log(f"Total matches: {len(filtered)}", caller="App", verbose=VERBOSE)
-    return jsonify(filtered)
+    log(f"Total matches: {len(matches)}", caller="App", verbose=VERBOSE)
+    return jsonify(matches)
 
 @app.route("/api/products/<int:product_id>")
 def api_product(product_id: int):
     """Return a single product by id or 404 if not found."""
     log(f"/api/products/{product_id} called", caller="App", verbose=VERBOSE)
-    products = get_products()
-    for p in products:
-        if p.get("id") == product_id:
-            return jsonify(p)
-    return jsonify({"error": "Product not found"}), 404
+    product = PRODUCTS.get(product_id)
+    if product is None:
+        return jsonify({"error": "Product not found"}), 404
+    return jsonify(product)
 
 @app.route("/api/login", methods=["POST"])
 def api_login():
@@ -128,8 +326,7 @@ def api_add_product():
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
-    products = get_products() 
-    new_id = max([p["id"] for p in products], default=0) + 1
+    new_id = get_max_product_id() + 1
     new_product = {
         "id": new_id,
         "name": data.get("name", "TBD"),
@@ -140,7 +337,6 @@ def api_add_product():
     }
 
     # Save to DB
-    from src.utils.db_utils import add_product
     add_product(new_product)
 
     return jsonify(new_product), 201
@@ -160,8 +356,7 @@ def random_products():
     """Return 6 random products."""
     log("/api/products/random called", caller="App", verbose=VERBOSE)
     try:
-        products = get_products()
-        selected = random.sample(products, k=min(6, len(products)))
+        selected = PRODUCTS.sample(6)
         return jsonify(selected)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,66 @@
+import argparse
+import sqlite3
+from functools import partial
+from pathlib import Path
+
+from src.utils.db_pool import enable_wal
+from src.utils.db_utils import DB_PATH, create_search_index
+from src.utils.catalog import create_version_table
+from src.utils.logger import log
+
+# Databases of the app and the steps that bring each one up to date. Every
+# step takes a connection inside a transaction and must be safe to run again.
+MIGRATIONS = {
+    "products": (create_search_index, partial(create_version_table, table="products")),
+    "gallery": (partial(create_version_table, table="gallery"),),
+}
+
+def migrate(db_dir: Path = DB_PATH, verbose: bool = True) -> list[Path]:
+    """
+    Bring the databases in a directory up to date for the server.
+
+    Every database is switched to WAL mode (stored in the file), so readers
+    never wait for a writer, then its migration steps run in one transaction.
+    The server only checks that they ran and never changes the files itself.
+
+    Args:
+        db_dir (Path): Directory holding the `.db` files.
+        verbose (bool): Whether to print progress messages.
+
+    Returns:
+        list[Path]: Databases that were migrated, missing ones are skipped.
+    """
+    migrated = []
+    for db_name, steps in MIGRATIONS.items():
+        path = Path(db_dir) / f"{db_name}.db"
+        if not path.exists():
+            log(f"Skipping {path}, it does not exist", caller="Migrate", verbose=verbose)
+            continue
+        if not enable_wal(path):
+            raise RuntimeError(f"Could not switch {path} to WAL mode")
+
+        conn = sqlite3.connect(path)
+        try:
+            with conn:
+                for step in steps:
+                    step(conn)
+        finally:
+            conn.close()
+        migrated.append(path)
+        log(f"Migrated {path}", caller="Migrate", verbose=verbose)
+    return migrated
+
+def main():
+    p = argparse.ArgumentParser(
+        description="Prepare the SQLite databases in data/db for the server")
+    p.add_argument(
+        "--db-dir",
+        type=Path,
+        default=DB_PATH,
+        help=f"Directory holding products.db and gallery.db. Default is {DB_PATH}.")
+    args = p.parse_args()
+
+    migrate(args.db_dir)
+
+if __name__ == "__main__":
+    main()
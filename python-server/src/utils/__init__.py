@@ -1,8 +1,56 @@
 # utils/__init__.py
-from .data_processor import DataProcessor
-from .model_trainer import ModelTrainer
-from .predict import Predictor
-from .db_utils import get_gallery, get_products, add_product, delete_product
-from .predict_number import predict_number_from_request
-from .models import loader
-from .logger import log
+import importlib
+
+# Exports are imported on first access, so serving code never pulls in
+# training code (ModelTrainer imports TensorFlow) or unused dependencies.
+_EXPORTS = {
+    "DataProcessor": ".data_processor",
+    "ModelTrainer": ".model_trainer",
+    "Predictor": ".predict",
+    "NumpyMLP": ".numpy_mlp",
+    "CompiledForest": ".compiled_forest",
+    "LinearSoftmax": ".linear_model",
+    "BatchScheduler": ".batching",
+    "DebugCapture": ".debug_capture",
+    "PredictionCache": ".prediction_cache",
+    "ResultSink": ".result_sink",
+    "merge_result_logs": ".result_sink",
+    "PredictionStore": ".prediction_store",
+    "get_prediction_store": ".prediction_store",
+    "Metrics": ".metrics",
+    "get_metrics": ".metrics",
+    "ConnectionPool": ".db_pool",
+    "get_pool": ".db_pool",
+    "Catalog": ".catalog",
+    "get_catalog": ".catalog",
+    "get_gallery": ".db_utils",
+    "get_products": ".db_utils",
+    "get_product": ".db_utils",
+    "get_products_by_ids": ".db_utils",
+    "get_max_product_id": ".db_utils",
+    "search_products": ".db_utils",
+    "get_page": ".db_utils",
+    "iter_entries": ".db_utils",
+    "add_product": ".db_utils",
+    "delete_product": ".db_utils",
+    "predict_number_from_request": ".predict_number",
+    "loader": ".models",
+    "LazyModels": ".models",
+    "ModelRegistry": ".model_registry",
+    "publish_version": ".model_registry",
+    "log": ".logger",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    """Import an export's module on first access (PEP 562)."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
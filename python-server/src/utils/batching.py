@@ -0,0 +1,152 @@
+# python-server/src/utils/batching.py
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from queue import Queue, Empty
+import numpy as np
+from .logger import log
+from src.config import VERBOSE
+
+class BatchScheduler:
+    """
+    Gather concurrent single-row predictions into one batched forward pass.
+
+    Requests are queued by `submit` and picked up by a background worker thread.
+    The worker waits at most `max_wait_ms` after the first queued row for more rows,
+    up to `max_batch_size`, stacks them into one (N, 784) array, runs a single
+    prediction and hands each caller its own row of probabilities.
+
+    Attributes:
+        predict_fn (callable): Function `(model, batch) -> np.ndarray` returning (N, C) probabilities.
+        max_batch_size (int): Maximum number of rows in one forward pass.
+        max_wait_ms (float): Maximum time to wait for a batch to fill up.
+        name (str): Name used in log messages (usually the MODELS key).
+        verbose (bool): If True, prints debug messages.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 32, max_wait_ms: float = 2.0,
+                 name: str = "model", verbose: bool = None):
+        """
+        Initialize the BatchScheduler. The worker thread is started on first use.
+
+        Args:
+            predict_fn (callable): Batched prediction function `(model, batch) -> np.ndarray`.
+            max_batch_size (int): Maximum number of rows in one forward pass.
+            max_wait_ms (float): Maximum time in milliseconds to wait for a batch to fill up.
+            name (str): Name used in log messages.
+            verbose (bool, optional): Whether to print debug messages. Defaults to VERBOSE from config.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self.verbose = verbose if verbose is not None else VERBOSE
+
+        self._queue = Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self._requests = 0
+        self._batches = 0
+        self._max_queue_depth = 0
+        self._batch_sizes = Counter()
+
+    def submit(self, model, row: np.ndarray) -> np.ndarray:
+        """
+        Queue one input row and block until its probabilities are available.
+
+        Args:
+            model: Model the row should be predicted with.
+            row (np.ndarray): Preprocessed input row (shape: (784,)).
+
+        Returns:
+            np.ndarray: Predicted class probabilities for this row.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((model, np.asarray(row).reshape(-1), future))
+
+        with self._lock:
+            self._requests += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+
+        return future.result()
+
+    def stats(self) -> dict:
+        """
+        Return queue depth and batch-size counters.
+
+        Returns:
+            dict: Current and maximum queue depth, request and batch counts,
+                  and the batch-size distribution.
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "requests": self._requests,
+                "batches": self._batches,
+                "batch_sizes": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+            }
+
+    def _ensure_worker(self):
+        """Start the worker thread if it is not running (e.g. after a fork)."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=f"BatchScheduler-{self.name}", daemon=True
+                )
+                self._worker.start()
+
+    def _collect_batch(self) -> list:
+        """Block for the first item, then gather more until the batch is full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """Worker loop: collect a batch, run one forward pass per model, resolve the futures."""
+        while True:
+            batch = self._collect_batch()
+
+            with self._lock:
+                self._batches += 1
+                self._batch_sizes[len(batch)] += 1
+
+            log(f"Running batch of {len(batch)} rows", caller=f"BatchScheduler:{self.name}",
+                verbose=self.verbose)
+
+            # Group by model object so a model swap never mixes two models in one pass
+            groups = {}
+            for model, row, future in batch:
+                groups.setdefault(id(model), (model, []))[1].append((row, future))
+
+            for model, items in groups.values():
+                try:
+                    data = np.stack([row for row, _ in items])
+                    probabilities = self.predict_fn(model, data)
+                except Exception as e:
+                    for _, future in items:
+                        future.set_exception(e)
+                    continue
+
+                for i, (_, future) in enumerate(items):
+                    future.set_result(probabilities[i])
@@ -0,0 +1,320 @@
+# python-server/src/utils/catalog.py
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from .logger import log
+from .db_utils import read_connection, LISTS
+from src.config import VERBOSE, CATALOG_CHECK_INTERVAL
+
+try:
+    import brotli
+except ImportError:  # Optional, responses are gzip-compressed only without it
+    brotli = None
+
+# Content encodings a snapshot can be sent in, preferred first
+ENCODINGS = ("br", "gzip", "identity") if brotli is not None else ("gzip", "identity")
+
+# Version row of a database, bumped by triggers on every change of the table.
+# `{table}` is filled in per catalog. `python -m src.migrate_db` creates them,
+# a Catalog only checks that they are there.
+VERSION_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS catalog_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )""",
+    "INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 1)",
+    """CREATE TRIGGER IF NOT EXISTS {table}_version_insert AFTER INSERT ON {table} BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_version_update AFTER UPDATE ON {table} BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_version_delete AFTER DELETE ON {table} BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+    END""",
+)
+
+# Names of the table and triggers created by VERSION_SCHEMA
+VERSION_OBJECTS = ("catalog_version", "{table}_version_insert", "{table}_version_update", "{table}_version_delete")
+
+def create_version_table(conn, table: str) -> None:
+    """
+    Create the version row and the triggers that bump it on every change of a table.
+    Migration step of the catalog databases.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database in a transaction.
+        table (str): Table holding the catalog.
+    """
+    for statement in VERSION_SCHEMA:
+        conn.execute(statement.format(table=table))
+
+class CatalogSnapshot:
+    """
+    All rows of a catalog table at one version.
+
+    The items are shared by every request reading this snapshot and must not
+    be modified. The JSON body of the whole list is serialized and compressed
+    once per encoding on first use and kept with the snapshot, so repeated
+    requests for an unchanged catalog only copy bytes.
+
+    Attributes:
+        version (int): Catalog version the rows were read at.
+        items (list[dict]): Rows in id order.
+        by_id (dict): Row per id.
+        ids (tuple): Ids in order, the population for `Catalog.sample`.
+    """
+
+    __slots__ = ("version", "items", "by_id", "ids", "_bodies", "_digest")
+
+    def __init__(self, version: int, items: list):
+        self.version = version
+        self.items = items
+        self.by_id = {item["id"]: item for item in items}
+        self.ids = tuple(self.by_id)
+        self._bodies = {}
+        self._digest = None
+
+    def body(self, encoding: str = "identity") -> bytes:
+        """
+        Return the items as a JSON array, encoded for a Content-Encoding.
+
+        Args:
+            encoding (str): One of ENCODINGS.
+
+        Returns:
+            bytes: Encoded body, computed on first use.
+        """
+        body = self._bodies.get(encoding)
+        if body is None:
+            body = json.dumps(self.items, separators=(",", ":")).encode() if encoding == "identity" \
+                else _compress(self.body(), encoding)
+            self._bodies[encoding] = body
+        return body
+
+    def etag(self, encoding: str = "identity") -> str:
+        """
+        Return the strong ETag of the body in an encoding.
+
+        The tag is a hash of the JSON body, so it stays the same across
+        processes and restarts as long as the content does, with the encoding
+        appended because each encoding is a different representation.
+
+        Args:
+            encoding (str): One of ENCODINGS.
+
+        Returns:
+            str: ETag value without quotes.
+        """
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self.body(), digest_size=12).hexdigest()
+        return self._digest if encoding == "identity" else f"{self._digest}-{encoding}"
+
+class Catalog:
+    """
+    Process-local copy of a catalog table, reloaded when the table changes.
+
+    Every insert, update or delete bumps the version row of the database
+    through triggers, whichever process made the change. A read first checks
+    the version row (one primary key lookup, at most every `check_interval`
+    seconds) and only reloads the table if the version moved on, otherwise it
+    is answered from memory. Writes through db_utils call `invalidate`, so the
+    writing process sees its own change on the next read even between checks.
+
+    Attributes:
+        db_name (str): Database name in DB_PATH, e.g. 'products'.
+        table (str): Table holding the catalog.
+        check_interval (float): Seconds between version checks, 0 checks on every read.
+        verbose (bool): If True, prints debug messages.
+    """
+
+    def __init__(self, db_name: str, table: str, columns: str, to_dict, check_interval: float = 0.0,
+                 verbose: bool = None):
+        """
+        Initialize the Catalog. The table is read on first access.
+
+        Args:
+            db_name (str): Database name in DB_PATH, e.g. 'products'.
+            table (str): Table holding the catalog.
+            columns (str): Columns to select, the first one is the id.
+            to_dict (callable): Converts a row of `columns` to a dict.
+            check_interval (float): Seconds between version checks, 0 checks on every read.
+            verbose (bool, optional): Whether to print debug messages. Defaults to VERBOSE from config.
+        """
+        self.db_name = db_name
+        self.table = table
+        self.columns = columns
+        self.to_dict = to_dict
+        self.check_interval = check_interval
+        self.verbose = verbose if verbose is not None else VERBOSE
+
+        self._snapshot = None
+        self._checked = 0.0
+        self._schema_checked = False
+        self._lock = threading.Lock()
+
+        # Counters
+        self.loads = 0
+        self.checks = 0
+
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        Return the current snapshot, reloading the table if it changed.
+
+        Returns:
+            CatalogSnapshot: Rows at the latest version.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked < self.check_interval:
+            return snapshot
+
+        self._check_schema()
+        with read_connection(self.db_name) as conn:
+            version = self._read_version(conn)
+        self._checked = time.monotonic()
+        with self._lock:
+            self.checks += 1
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have loaded it while this one waited
+            if self._snapshot is None or self._snapshot.version < version:
+                self._snapshot = self._load()
+            return self._snapshot
+
+    def version(self) -> int:
+        """Return the current catalog version."""
+        return self.snapshot().version
+
+    def items(self) -> list:
+        """Return all rows in id order (shared, do not modify)."""
+        return self.snapshot().items
+
+    def get(self, item_id: int) -> dict | None:
+        """
+        Return one row by id.
+
+        Args:
+            item_id (int): Row id.
+
+        Returns:
+            dict | None: Row (shared, do not modify), or None if there is no row with this id.
+        """
+        return self.snapshot().by_id.get(item_id)
+
+    def sample(self, k: int) -> list:
+        """
+        Return up to k distinct random rows.
+
+        The ids are drawn from the id array of the snapshot, which only holds
+        existing ids (deleted ones leave no gaps to skip), and the rows are
+        taken from the id index, so the cost depends on k only.
+
+        Args:
+            k (int): Number of rows.
+
+        Returns:
+            list[dict]: Rows (shared, do not modify) in random order.
+        """
+        snapshot = self.snapshot()
+        ids = random.sample(snapshot.ids, k=min(k, len(snapshot.ids)))
+        return [snapshot.by_id[item_id] for item_id in ids]
+
+    def invalidate(self) -> None:
+        """Check the version on the next read, e.g. after a write by this process."""
+        self._checked = 0.0
+
+    def stats(self) -> dict:
+        """
+        Return catalog counters.
+
+        Returns:
+            dict: Loaded version and number of rows, reloads and version checks.
+        """
+        snapshot = self._snapshot
+        with self._lock:
+            return {
+                "version": snapshot.version if snapshot else None,
+                "items": len(snapshot.items) if snapshot else 0,
+                "loads": self.loads,
+                "checks": self.checks,
+            }
+
+    def _check_schema(self) -> None:
+        """
+        Check that the version row and its triggers exist (once per process).
+
+        Raises:
+            RuntimeError: If part of VERSION_SCHEMA is missing.
+        """
+        if self._schema_checked:
+            return
+        with read_connection(self.db_name) as conn:
+            names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        missing = [name.format(table=self.table) for name in VERSION_OBJECTS
+                   if name.format(table=self.table) not in names]
+        if missing:
+            raise RuntimeError(f"{self.db_name}.db has no {', '.join(missing)}, run `python -m src.migrate_db`")
+        self._schema_checked = True
+
+    @staticmethod
+    def _read_version(conn) -> int:
+        """Read the version row."""
+        return conn.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()[0]
+
+    def _load(self) -> CatalogSnapshot:
+        """Read the version and all rows in one read transaction."""
+        start = time.perf_counter()
+        with read_connection(self.db_name) as conn:
+            conn.execute("BEGIN")
+            try:
+                version = self._read_version(conn)
+                rows = conn.execute(f"SELECT {self.columns} FROM {self.table} ORDER BY id").fetchall()
+            finally:
+                conn.execute("COMMIT")
+        snapshot = CatalogSnapshot(version, [self.to_dict(row) for row in rows])
+        self.loads += 1
+        log(f"Loaded {len(rows)} rows of {self.table} at version {version} "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms", caller="Catalog", verbose=self.verbose)
+        return snapshot
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    """Compress a body for a Content-Encoding."""
+    if encoding == "gzip":
+        # Without a timestamp the output, and so the ETag, only depends on the data
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data)
+    raise ValueError(f"Unsupported encoding '{encoding}'")
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def get_catalog(db_name: str) -> Catalog:
+    """
+    Return the process-wide Catalog of a database, configured from src/config.py.
+
+    Args:
+        db_name (str): 'products' or 'gallery'.
+
+    Returns:
+        Catalog: Shared instance.
+
+    Raises:
+        KeyError: If there is no catalog for this database.
+    """
+    catalog = _catalogs.get(db_name)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(db_name)
+            if catalog is None:
+                table, columns, to_dict = LISTS[db_name]
+                catalog = _catalogs[db_name] = Catalog(
+                    db_name, table, columns, to_dict,
+                    check_interval=CATALOG_CHECK_INTERVAL
+                )
+    return catalog
@@ -0,0 +1,219 @@
+# python-server/src/utils/compiled_forest.py
+import numpy as np
+from pathlib import Path
+from .model_store import STORE_DIR, save_arrays, load_arrays
+
+class CompiledForest:
+    """
+    Array-based inference engine for a trained RandomForestClassifier.
+
+    All trees are flattened into one set of contiguous node arrays, so every
+    (row, tree) pair is advanced one level per step with a handful of vectorized
+    gathers, and pairs that reached a leaf drop out of the next step. Leaf values
+    are the per-tree class probabilities, summed in tree order and divided by the
+    number of trees exactly like sklearn does, so the probabilities are identical
+    to `RandomForestClassifier.predict_proba` (evaluated with n_jobs=1, parallel
+    sklearn adds the trees in whatever order the threads finish).
+
+    Attributes:
+        model_name (str): Name used by Predictor for logging.
+        feature (np.ndarray): Split feature per node (0 for leaves), int32.
+        threshold (np.ndarray): Split threshold per node, float64.
+        left (np.ndarray): Global index of the left child (leaves point to themselves), int32.
+        right (np.ndarray): Global index of the right child (leaves point to themselves), int32.
+        leaf_id (np.ndarray): Row in `leaf_value` per node (-1 for split nodes), int32.
+        leaf_value (np.ndarray): Class probabilities per leaf, float64 (shape: (n_leaves, n_classes)).
+        roots (np.ndarray): Global index of the root node of each tree, int32.
+        classes_ (np.ndarray): Class labels, same as the original model.
+        max_depth (int): Depth of the deepest tree.
+    """
+
+    model_name = "random_forest"
+
+    ARRAYS = ("feature", "threshold", "left", "right", "leaf_id", "leaf_value", "roots", "classes_")
+
+    def __init__(self, feature, threshold, left, right, leaf_id, leaf_value, roots, classes_, max_depth: int):
+        """
+        Initialize the CompiledForest from flattened node arrays (see `from_sklearn`).
+
+        Raises:
+            ValueError: If the node arrays do not have the same length.
+        """
+        if not (len(feature) == len(threshold) == len(left) == len(right) == len(leaf_id)):
+            raise ValueError("Node arrays must have the same length")
+
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_id = leaf_id
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.classes_ = classes_
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_estimators(self) -> int:
+        """Number of trees."""
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        """Total number of nodes over all trees."""
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "CompiledForest":
+        """
+        Flatten the trees of a fitted RandomForestClassifier.
+
+        Args:
+            forest: Fitted sklearn RandomForestClassifier (single output).
+
+        Returns:
+            CompiledForest: Forest with the same predictions.
+
+        Raises:
+            ValueError: If the forest has more than one output.
+        """
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output forests are supported")
+
+        features, thresholds, lefts, rights, leaf_ids, leaf_values, roots = [], [], [], [], [], [], []
+        offset = 0
+        n_leaves = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            nodes = np.arange(n)
+            is_leaf = tree.children_left == -1
+
+            # Leaves point to themselves and compare feature 0 against anything
+            feature = np.where(is_leaf, 0, tree.feature)
+            left = np.where(is_leaf, nodes, tree.children_left) + offset
+            right = np.where(is_leaf, nodes, tree.children_right) + offset
+            leaf_id = np.full(n, -1, dtype=np.int64)
+            leaf_id[is_leaf] = np.arange(n_leaves, n_leaves + is_leaf.sum())
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            value = tree.value[is_leaf, 0, :len(forest.classes_)].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value /= normalizer
+
+            features.append(feature)
+            thresholds.append(tree.threshold)
+            lefts.append(left)
+            rights.append(right)
+            leaf_ids.append(leaf_id)
+            leaf_values.append(value)
+            roots.append(offset)
+
+            offset += n
+            n_leaves += int(is_leaf.sum())
+            max_depth = max(max_depth, int(tree.max_depth))
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            leaf_id=np.concatenate(leaf_ids).astype(np.int32),
+            leaf_value=np.ascontiguousarray(np.concatenate(leaf_values)),
+            roots=np.array(roots, dtype=np.int32),
+            classes_=np.asarray(forest.classes_),
+            max_depth=max_depth,
+        )
+
+    @classmethod
+    def load(cls, name: str = "RandomForest", store_dir: Path = STORE_DIR, mmap_mode: str = "r") -> "CompiledForest":
+        """
+        Load a forest saved with `save`, memory-mapping its arrays by default.
+
+        Args:
+            name (str): Directory name in the store.
+            store_dir (Path): Store directory.
+            mmap_mode (str | None): Mode passed to `np.load`, None reads into memory.
+
+        Returns:
+            CompiledForest: Loaded forest.
+        """
+        arrays, meta = load_arrays(name, store_dir, mmap_mode=mmap_mode)
+        return cls(**{key: arrays[key] for key in cls.ARRAYS}, max_depth=meta["max_depth"])
+
+    def save(self, name: str = "RandomForest", store_dir: Path = STORE_DIR) -> Path:
+        """
+        Save the node arrays as `.npy` files in the model store.
+
+        Args:
+            name (str): Directory name in the store.
+            store_dir (Path): Store directory.
+
+        Returns:
+            Path: Path to the forest directory.
+        """
+        arrays = {key: getattr(self, key) for key in self.ARRAYS}
+        meta = {"max_depth": self.max_depth, "n_estimators": self.n_estimators, "n_nodes": self.n_nodes}
+        return save_arrays(name, arrays, meta, store_dir)
+
+    def apply(self, data: np.ndarray) -> np.ndarray:
+        """
+        Return the global leaf node each row ends up in, per tree.
+
+        Args:
+            data (np.ndarray): Input data (shape: (N, n_features)).
+
+        Returns:
+            np.ndarray: Node indices (shape: (N, n_estimators)).
+        """
+        # sklearn compares float32 features against float64 thresholds
+        x = np.ascontiguousarray(data, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[np.newaxis, :]
+        n_rows, n_features = x.shape
+        flat = x.ravel()
+
+        # One entry per (row, tree) pair, pairs that reached a leaf are dropped
+        leaves = np.tile(self.roots, n_rows)
+        pending = np.arange(len(leaves))
+        nodes = leaves.copy()
+        offsets = np.repeat(np.arange(n_rows) * n_features, self.n_estimators)
+        while len(pending):
+            go_left = flat[offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            done = self.leaf_id[nodes] >= 0
+            leaves[pending[done]] = nodes[done]
+            keep = ~done
+            pending, nodes, offsets = pending[keep], nodes[keep], offsets[keep]
+        return leaves.reshape(n_rows, self.n_estimators)
+
+    def predict_proba(self, data: np.ndarray) -> np.ndarray:
+        """
+        Predict class probabilities, identical to the original forest.
+
+        Args:
+            data (np.ndarray): Input data (shape: (N, n_features)).
+
+        Returns:
+            np.ndarray: Class probabilities (shape: (N, n_classes)), float64.
+        """
+        values = self.leaf_value[self.leaf_id[self.apply(data)]]  # (N, n_estimators, n_classes)
+        # Reducing over the middle axis adds the trees one by one in order,
+        # the same summation order as sklearn's per-tree accumulation
+        proba = values.sum(axis=1)
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, data: np.ndarray) -> np.ndarray:
+        """
+        Predict class labels.
+
+        Args:
+            data (np.ndarray): Input data (shape: (N, n_features)).
+
+        Returns:
+            np.ndarray: Class label per row.
+        """
+        return self.classes_.take(self.predict_proba(data).argmax(axis=1))
@@ -1,11 +1,14 @@
 # python-server/src/utils/data_processor.py
 import base64
 import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from pathlib import Path
 from PIL import Image
-from scipy import ndimage
 from .logger import log
+from .debug_capture import get_debug_capture
+from .metrics import get_metrics
 from src.config import VERBOSE
 
 class DataProcessor:
@@ -19,24 +22,57 @@ class DataProcessor:
         - Centering the image on a 28x28 grayscale canvas
         - Centering based on the center of mass (MNIST-style)
         - Normalizing pixel values to [0, 1] and flattening to 1D array
-        - Saving processed images for debugging
+        - Saving sampled processed images for debugging (opt-in, see DebugCapture)
+
+    `preprocess_image` runs all steps after decoding as one NumPy kernel with
+    reused buffers. It gives the same output as `resize_and_center_image`
+    followed by `normalize_and_flatten_image`, which are kept as the reference.
 
     Attributes:
-        save_dir (Path): Directory to save processed images.
+        save_dir (Path): Directory to save debug images.
         verbose (bool): If True, prints debug messages.
+        capture (DebugCapture): Debug image writer.
+        capture_id (str | None): Id used in debug filenames, None if this request is not captured.
+        metrics (Metrics): Latency histograms, each step is timed as a stage.
     """
 
-    def __init__(self, save_dir="images", verbose=None):
+    SIZE = 28          # Output canvas size (MNIST)
+    BOX = 20           # Content is rescaled to fit within BOX x BOX
+    _INDEX = np.arange(SIZE)
+
+    # Per-thread working buffers for the NumPy kernel
+    _buffers = threading.local()
+
+    def __init__(self, save_dir="images", verbose=None, capture=None):
         """
-        Initialize the DataProcessor.
+        Initialize the DataProcessor. Create one instance per request so that
+        debug capture sampling is done per request.
 
         Args:
-            save_dir (str): Directory where processed images will be saved.
+            save_dir (str): Directory where debug images will be saved.
             verbose (bool): Whether to print debug messages.
+            capture (DebugCapture, optional): Debug image writer. Defaults to the
+                shared instance configured in src/config.py (off by default).
         """
         self.save_dir = Path(save_dir)
-        self.save_dir.mkdir(parents=True, exist_ok=True)
         self.verbose = verbose if verbose is not None else VERBOSE
+        self.capture = capture if capture is not None else get_debug_capture()
+        self.capture_id = self.capture.sample()
+        self.metrics = get_metrics()
+
+    def _save_debug_image(self, name: str, image) -> None:
+        """
+        Queue a debug image if this request is sampled, never blocks.
+
+        Args:
+            name (str): Processing stage, used in the filename.
+            image (Image.Image | np.ndarray): Image to save.
+        """
+        if self.capture_id is None:
+            return
+        output_path = self.save_dir / f"{self.capture_id}_{name}.png"
+        if self.capture.submit(output_path, image):
+            log(f"Queued debug image {output_path}", caller="DataProcessor", verbose=self.verbose)
 
     def convert_np_array_to_image(self, array: np.ndarray) -> Image.Image:
         """
@@ -64,7 +100,7 @@ class DataProcessor:
     def decode_base64_image(self, base64_string: str):
         """
         Decode a Base64-encoded string into a PIL Image.
-        Saves the decoded image for debugging.
+        Saves the decoded image for debugging if the request is sampled.
 
         Args:
             base64_string (str): Base64-encoded image string.
@@ -72,26 +108,100 @@ class DataProcessor:
         Returns:
             Image.Image: Decoded PIL Image.
         """
-        # Remove header if present (e.g., "data:image/png;base64,")
-        if "," in base64_string:
-            header, data = base64_string.split(",", 1)
-            log(f"Header removed: {header}", caller="DataProcessor", verbose=self.verbose)
-        else:
-            data = base64_string
-
-        # Convert Base64 string to bytes
-        image_bytes = base64.b64decode(data)
+        with self.metrics.time("base64_decode"):
+            # Remove header if present (e.g., "data:image/png;base64,")
+            if "," in base64_string:
+                header, data = base64_string.split(",", 1)
+                log(f"Header removed: {header}", caller="DataProcessor", verbose=self.verbose)
+            else:
+                data = base64_string
+
+            # Convert Base64 string to bytes
+            image_bytes = base64.b64decode(data)
         log("Converted Base64 string to bytes", caller="DataProcessor", verbose=self.verbose)
 
-        # Create a PIL Image
-        image = Image.open(io.BytesIO(image_bytes))
+        # Create a PIL Image, decoded right away so the time is spent in this stage
+        with self.metrics.time("png_decode"):
+            image = Image.open(io.BytesIO(image_bytes))
+            image.load()
         log(f"Image created: size={image.size}, mode={image.mode}", caller="DataProcessor", verbose=self.verbose)
         # Save for debugging
-        output_path = self.save_dir / "decoded_image.png"
-        image.save(output_path)
-        log(f"Decoded image saved to {output_path}", caller="DataProcessor", verbose=self.verbose)
+        self._save_debug_image("decoded", image)
         return image
 
+    def decode_raw_frame(self, buffer, width: int = None, height: int = None) -> np.ndarray:
+        """
+        Wrap a raw uint8 grayscale frame as a 2D array without copying or PIL decoding.
+
+        The frame can be at canvas resolution or already reduced to 28x28.
+        Without width/height, a 784-byte frame is read as 28x28 and any other
+        square number of bytes as a square frame.
+
+        Args:
+            buffer (bytes | memoryview): Row-major grayscale pixels, one byte per pixel.
+            width (int, optional): Frame width in pixels.
+            height (int, optional): Frame height in pixels.
+
+        Returns:
+            np.ndarray: Read-only 2D uint8 array (height, width) backed by `buffer`.
+
+        Raises:
+            ValueError: If the frame size does not match the given or inferred shape.
+        """
+        frame = np.frombuffer(buffer, dtype=np.uint8)
+        height, width = self._frame_shape(frame.size, width, height)
+        frame = frame.reshape(height, width)
+        log(f"Raw frame decoded: size=({width}, {height})", caller="DataProcessor", verbose=self.verbose)
+        self._save_debug_image("decoded", frame)
+        return frame
+
+    def decode_pixel_array(self, pixels: list, width: int = None, height: int = None) -> np.ndarray:
+        """
+        Convert a JSON array of grayscale pixel values (flat or nested rows) to a 2D array.
+
+        Args:
+            pixels (list): Pixel values 0-255, flat row-major or a list of rows.
+            width (int, optional): Frame width in pixels (flat arrays only).
+            height (int, optional): Frame height in pixels (flat arrays only).
+
+        Returns:
+            np.ndarray: 2D uint8 array (height, width).
+
+        Raises:
+            ValueError: If the values are out of range or the shape cannot be determined.
+        """
+        frame = np.asarray(pixels)
+        if frame.size and (frame.min() < 0 or frame.max() > 255):
+            raise ValueError("Pixel values must be in the range 0-255")
+        frame = frame.astype(np.uint8)
+        if frame.ndim == 1:
+            frame = frame.reshape(self._frame_shape(frame.size, width, height))
+        elif frame.ndim != 2:
+            raise ValueError("Pixel array must be flat or a list of rows")
+        log(f"Pixel array decoded: size=({frame.shape[1]}, {frame.shape[0]})", caller="DataProcessor", verbose=self.verbose)
+        self._save_debug_image("decoded", frame)
+        return frame
+
+    def _frame_shape(self, size: int, width: int = None, height: int = None) -> tuple:
+        """
+        Determine (height, width) of a flat frame of `size` pixels.
+
+        Raises:
+            ValueError: If the size does not match the given or inferred shape.
+        """
+        if width or height:
+            width = int(width) if width else size // int(height)
+            height = int(height) if height else size // width
+            shape = (height, width)
+        elif size == self.SIZE * self.SIZE:
+            shape = (self.SIZE, self.SIZE)
+        else:
+            side = int(round(size ** 0.5))
+            shape = (side, side)
+        if size == 0 or shape[0] * shape[1] != size:
+            raise ValueError(f"Frame of {size} bytes does not match shape {shape[1]}x{shape[0]}")
+        return shape
+
     def resize_and_center_image(self, image: Image.Image) -> Image.Image:
         """
         Resize image to fit within 20x20 box while maintaining aspect ratio,
@@ -134,7 +244,8 @@ class DataProcessor:
         # Paste resized image onto the center of the canvas
         canvas.paste(image, offset)
 
-        # center of mass centering (MNIST-style)
+        # center of mass centering (MNIST-style), SciPy is only needed by this reference path
+        from scipy import ndimage
         canvas_np = np.array(canvas)
         cy, cx = ndimage.center_of_mass(canvas_np)
         log(f"Center of mass: ({cx}, {cy})", caller="DataProcessor", verbose=self.verbose)
@@ -153,9 +264,7 @@ class DataProcessor:
         canvas = Image.fromarray(canvas_np)
 
         # Save for debugging
-        output_path = self.save_dir / "resized_centered_image.png"
-        canvas.save(output_path)
-        log(f"Resized and centered image saved to {output_path}", caller="DataProcessor", verbose=self.verbose)
+        self._save_debug_image("resized_centered", canvas)
 
         return canvas
 
@@ -181,3 +290,207 @@ class DataProcessor:
         log("Flattened image to 1D array", caller="DataProcessor", verbose=self.verbose)
 
         return flattened_array
+
+    # --------------------------------------------------
+    # NumPy preprocessing kernel
+    # --------------------------------------------------
+    def preprocess_image(self, image: Image.Image) -> np.ndarray:
+        """
+        Convert a decoded image to the normalized 784-vector in one NumPy pass.
+
+        Equivalent to `resize_and_center_image` followed by `normalize_and_flatten_image`
+        (bit-identical output), without the intermediate PIL images.
+
+        Args:
+            image (Image.Image): Decoded PIL Image.
+
+        Returns:
+            np.ndarray: Flattened and normalized float32 array (shape: (784,)).
+        """
+        with self.metrics.time("grayscale"):
+            gray = np.asarray(image.convert("L"))
+        return self.preprocess_array(gray)
+
+    def preprocess_array(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Crop, rescale, center and normalize a grayscale uint8 array.
+
+        Args:
+            gray (np.ndarray): 2D uint8 grayscale image (height, width).
+
+        Returns:
+            np.ndarray: Flattened and normalized float32 array (shape: (784,)).
+
+        Raises:
+            ValueError: If the image has no content to center.
+        """
+        canvas, centered = self._workspace()
+        canvas.fill(0)
+
+        with self.metrics.time("crop_resize"):
+            self._place_content(gray, canvas[0])
+        with self.metrics.time("center_of_mass_shift"):
+            self._center_of_mass_shift(canvas, centered)
+
+        # Save for debugging
+        self._save_debug_image("resized_centered", centered[0])
+
+        # Normalize to [0, 1] exactly like normalize_and_flatten_image
+        with self.metrics.time("normalize"):
+            output = centered[0].astype(np.float32).reshape(-1)
+            output /= 255.0
+        return output
+
+    def preprocess_batch(self, images, max_workers: int = None) -> np.ndarray:
+        """
+        Preprocess many images into one (N, 784) float32 array.
+
+        Each row is identical to `preprocess_image` for the same input, so the
+        result can be passed directly to `predict_proba` / `predict` of the models.
+        Decoding and cropping/rescaling are done per image, the center-of-mass
+        shift and normalization run once over the whole (N, 28, 28) stack.
+        No debug images are saved.
+
+        Args:
+            images (Iterable): Base64 strings (with or without data URL header),
+                PNG bytes, PIL Images or 2D uint8 grayscale arrays.
+            max_workers (int, optional): If given, decode in a thread pool of this size.
+                PIL releases the GIL while decoding PNGs, so this helps for large batches.
+
+        Returns:
+            np.ndarray: Flattened and normalized float32 array (shape: (N, 784)).
+
+        Raises:
+            ValueError: If an image has no content to center.
+        """
+        images = list(images)
+        if max_workers and len(images) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                grays = list(pool.map(self._to_grayscale_array, images))
+        else:
+            grays = [self._to_grayscale_array(image) for image in images]
+        log(f"Decoded {len(grays)} images", caller="DataProcessor", verbose=self.verbose)
+
+        canvases = np.zeros((len(grays), self.SIZE, self.SIZE), dtype=np.uint8)
+        for gray, canvas in zip(grays, canvases):
+            self._place_content(gray, canvas)
+
+        centered = np.empty_like(canvases)
+        self._center_of_mass_shift(canvases, centered)
+
+        output = centered.reshape(len(grays), -1).astype(np.float32)
+        output /= 255.0
+        return output
+
+    @staticmethod
+    def _to_grayscale_array(image) -> np.ndarray:
+        """
+        Decode one batch item into a 2D uint8 grayscale array.
+
+        Args:
+            image: Base64 string, PNG bytes, PIL Image or 2D uint8 array.
+
+        Returns:
+            np.ndarray: 2D uint8 grayscale array.
+        """
+        if isinstance(image, np.ndarray):
+            if image.ndim != 2 or image.dtype != np.uint8:
+                raise ValueError("Array input must be a 2D uint8 grayscale image")
+            return image
+        if isinstance(image, str):
+            image = base64.b64decode(image.split(",", 1)[-1])
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            image = Image.open(io.BytesIO(image))
+        return np.asarray(image.convert("L"))
+
+    def _workspace(self):
+        """Return this thread's preallocated (1, 28, 28) canvas and output buffers."""
+        buffers = DataProcessor._buffers
+        if not hasattr(buffers, "canvas"):
+            buffers.canvas = np.zeros((1, self.SIZE, self.SIZE), dtype=np.uint8)
+            buffers.centered = np.zeros((1, self.SIZE, self.SIZE), dtype=np.uint8)
+        return buffers.canvas, buffers.centered
+
+    @staticmethod
+    def _nearest_index(size_in: int, size_out: int) -> np.ndarray:
+        """
+        Source indices used by PIL's NEAREST resize along one axis.
+
+        PIL samples pixel centers and accumulates the step size, so the
+        coordinates are accumulated the same way to pick identical pixels.
+        """
+        step = size_in / size_out
+        coords = np.full(size_out, step)
+        coords[0] = step * 0.5
+        index = np.add.accumulate(coords).astype(np.intp)
+        return np.minimum(index, size_in - 1, out=index)
+
+    def _place_content(self, gray: np.ndarray, canvas: np.ndarray) -> None:
+        """
+        Crop to the content bounding box, rescale to fit within 20x20 (NEAREST)
+        and paste it in the middle of a zeroed 28x28 canvas.
+
+        Args:
+            gray (np.ndarray): 2D uint8 grayscale image.
+            canvas (np.ndarray): Zeroed (28, 28) uint8 array to paste into.
+        """
+        # Crop to content (same as PIL getbbox on a grayscale image),
+        # columns are only scanned within the band of non-empty rows
+        rows = np.flatnonzero(gray.max(axis=1))
+        if rows.size:
+            top, bottom = rows[0], rows[-1] + 1
+            cols = np.flatnonzero(gray[top:bottom].max(axis=0))
+            left, right = cols[0], cols[-1] + 1
+        else:
+            top, bottom, left, right = 0, gray.shape[0], 0, gray.shape[1]
+
+        w, h = right - left, bottom - top
+        scale = self.BOX / max(w, h)
+        new_w, new_h = int(w * scale), int(h * scale)
+        if new_w <= 0 or new_h <= 0:
+            raise ValueError("height and width must be > 0")
+
+        y_index = top + self._nearest_index(h, new_h)
+        x_index = left + self._nearest_index(w, new_w)
+
+        offset_x = (self.SIZE - new_w) // 2
+        offset_y = (self.SIZE - new_h) // 2
+        canvas[offset_y:offset_y + new_h, offset_x:offset_x + new_w] = gray[np.ix_(y_index, x_index)]
+
+    def _center_of_mass_shift(self, canvases: np.ndarray, out: np.ndarray) -> None:
+        """
+        Shift each canvas so its center of mass lands on (14, 14) (MNIST-style).
+
+        Matches `ndimage.center_of_mass` followed by an integer `ndimage.shift`
+        with order=0 and zero fill. Works on a whole (N, 28, 28) stack at once.
+
+        Args:
+            canvases (np.ndarray): (N, 28, 28) uint8 canvases.
+            out (np.ndarray): (N, 28, 28) uint8 array receiving the shifted canvases.
+
+        Raises:
+            ValueError: If a canvas is empty (its center of mass is undefined).
+        """
+        # Integer sums are exact, so the float division matches ndimage
+        total = canvases.sum(axis=(1, 2), dtype=np.int64)
+        if not total.all():
+            raise ValueError("cannot compute center of mass of an empty image")
+        cy = canvases.sum(axis=2, dtype=np.int64) @ self._INDEX / total
+        cx = canvases.sum(axis=1, dtype=np.int64) @ self._INDEX / total
+        if self.verbose:
+            log(f"Center of mass: {list(zip(cx.tolist(), cy.tolist()))}", caller="DataProcessor", verbose=self.verbose)
+
+        # np.rint rounds half to even like Python's round()
+        shift_y = np.rint(self.SIZE // 2 - cy).astype(np.intp)
+        shift_x = np.rint(self.SIZE // 2 - cx).astype(np.intp)
+
+        # Source row/column for every destination pixel, out of range means zero fill
+        src_rows = self._INDEX[None, :] - shift_y[:, None]
+        src_cols = self._INDEX[None, :] - shift_x[:, None]
+        valid = (((src_rows >= 0) & (src_rows < self.SIZE))[:, :, None]
+                 & ((src_cols >= 0) & (src_cols < self.SIZE))[:, None, :])
+        np.clip(src_rows, 0, self.SIZE - 1, out=src_rows)
+        np.clip(src_cols, 0, self.SIZE - 1, out=src_cols)
+
+        batch = np.arange(canvases.shape[0])[:, None, None]
+        np.multiply(canvases[batch, src_rows[:, :, None], src_cols[:, None, :]], valid, out=out)
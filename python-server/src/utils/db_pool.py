@@ -0,0 +1,209 @@
+# python-server/src/utils/db_pool.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from queue import LifoQueue, Empty, Full
+from .logger import log
+from src.config import (
+    VERBOSE,
+    DB_POOL_SIZE,
+    DB_MMAP_SIZE,
+    DB_CACHE_KIB,
+    DB_BUSY_TIMEOUT,
+    DB_CACHED_STATEMENTS,
+)
+
+class ConnectionPool:
+    """
+    Pool of long-lived SQLite connections to one database file.
+
+    Opening a connection and parsing the schema costs more than most of the
+    queries the app runs, so connections are opened once and handed out again.
+    Each connection keeps its own cache of prepared statements, a query that
+    ran before on that connection is not parsed again.
+
+    A read-only pool opens the file with `mode=ro` and `query_only`, so a
+    catalog read can never take the write lock. With the database in WAL mode
+    (see `python -m src.migrate_db`), readers see the last committed state and
+    never wait for a writer. Connections are not shared between processes: a forked worker
+    starts with an empty pool.
+
+    Attributes:
+        path (Path): Database file.
+        readonly (bool): Whether connections are opened read-only.
+        size (int): Maximum number of idle connections kept.
+        verbose (bool): If True, prints debug messages.
+    """
+
+    def __init__(self, path, readonly: bool = False, size: int = 8, mmap_size: int = 0,
+                 cache_kib: int = 2000, timeout: float = 5.0, cached_statements: int = 128,
+                 verbose: bool = None):
+        """
+        Initialize the ConnectionPool. Connections are opened on first use.
+
+        Args:
+            path (str | Path): Database file.
+            readonly (bool): Open connections read-only.
+            size (int): Maximum number of idle connections kept, more are closed after use.
+            mmap_size (int): Bytes of the file read through a memory map (PRAGMA mmap_size).
+            cache_kib (int): Page cache per connection in KiB (PRAGMA cache_size).
+            timeout (float): Seconds to wait for a lock held by another connection.
+            cached_statements (int): Prepared statements kept per connection.
+            verbose (bool, optional): Whether to print debug messages. Defaults to VERBOSE from config.
+        """
+        self.path = Path(path)
+        self.readonly = readonly
+        self.size = size
+        self.mmap_size = mmap_size
+        self.cache_kib = cache_kib
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.verbose = verbose if verbose is not None else VERBOSE
+
+        self._idle = LifoQueue(maxsize=size)
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.opened = 0
+        self.reused = 0
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the body of a with-block.
+
+        On a read-write pool the body runs in a transaction that is committed
+        when the block exits and rolled back on an exception.
+
+        Yields:
+            sqlite3.Connection: Connection used by this thread only until the block exits.
+        """
+        self._check_pid()
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.reused += 1
+        except Empty:
+            conn = self._open()
+
+        try:
+            if self.readonly:
+                yield conn
+            else:
+                with conn:
+                    yield conn
+        finally:
+            self._release(conn)
+
+    def stats(self) -> dict:
+        """
+        Return pool counters.
+
+        Returns:
+            dict: Idle, opened and reused connections.
+        """
+        with self._lock:
+            return {"idle": self._idle.qsize(), "opened": self.opened, "reused": self.reused}
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        """Keep a connection for reuse, or close it if enough are idle."""
+        try:
+            self._idle.put_nowait(conn)
+        except Full:
+            conn.close()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a connection with the pragmas of this pool."""
+        if self.readonly:
+            target, uri = f"{self.path.resolve().as_uri()}?mode=ro", True
+        else:
+            target, uri = self.path, False
+        # Connections move between the request threads, one thread at a time
+        conn = sqlite3.connect(target, uri=uri, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_kib)}")
+        if self.readonly:
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            conn.execute("PRAGMA synchronous = NORMAL")
+        # SQLite's lower() only folds ASCII letters
+        conn.create_function("unicode_lower", 1, _unicode_lower, deterministic=True)
+
+        with self._lock:
+            self.opened += 1
+        log(f"Opened {'read-only' if self.readonly else 'read-write'} connection to {self.path}",
+            caller="ConnectionPool", verbose=self.verbose)
+        return conn
+
+    def _check_pid(self):
+        """Forget connections inherited from the parent process after a fork."""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # The parent still uses them, so they are dropped without closing
+                    self._idle = LifoQueue(maxsize=self.size)
+                    self._pid = os.getpid()
+
+def _unicode_lower(text):
+    """Lowercase a text value with Python's Unicode rules, other values pass through."""
+    return text.lower() if isinstance(text, str) else text
+
+def enable_wal(path) -> bool:
+    """
+    Switch a database to WAL mode (stored in the file, so this is needed once).
+    Run by `python -m src.migrate_db`, the server does not change the mode.
+
+    Args:
+        path (str | Path): Database file.
+
+    Returns:
+        bool: True if the database is in WAL mode.
+    """
+    try:
+        conn = sqlite3.connect(path, timeout=DB_BUSY_TIMEOUT)
+        try:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            if mode != "wal":
+                mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        log(f"Could not enable WAL mode on {path}: {e}", caller="ConnectionPool", verbose=True)
+        return False
+    return mode == "wal"
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(path, readonly: bool = False) -> ConnectionPool:
+    """
+    Return the process-wide pool for a database file, configured from src/config.py.
+
+    Args:
+        path (str | Path): Database file.
+        readonly (bool): Return the read-only pool instead of the read-write one.
+
+    Returns:
+        ConnectionPool: Shared instance.
+    """
+    path = Path(path)
+    key = (os.path.abspath(path), readonly)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(
+                    path,
+                    readonly=readonly,
+                    size=DB_POOL_SIZE,
+                    mmap_size=DB_MMAP_SIZE,
+                    cache_kib=DB_CACHE_KIB,
+                    timeout=DB_BUSY_TIMEOUT,
+                    cached_statements=DB_CACHED_STATEMENTS
+                )
+    return pool
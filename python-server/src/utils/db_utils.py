@@ -1,12 +1,55 @@
-import sqlite3
+import json
 from typing import Dict
 from pathlib import Path
+from .db_pool import get_pool
 
 DB_PATH = Path('data/db')
 
 # --------------------------------------------------
 # Helper functions for SQLite databases
 # --------------------------------------------------
+# Reads go through read-only pooled connections, writes through read-write
+# ones (see db_pool.py), so a catalog read never waits for an admin write.
+
+def read_connection(db_name: str):
+    """
+    Borrow a read-only connection to a database in DB_PATH.
+
+    Args:
+        db_name (str): Database name without extension, e.g. 'products'.
+
+    Returns:
+        contextmanager: Yields a pooled sqlite3.Connection.
+    """
+    return get_pool(DB_PATH/f'{db_name}.db', readonly=True).connection()
+
+def write_connection(db_name: str):
+    """
+    Borrow a read-write connection to a database in DB_PATH.
+    The with-block runs in a transaction, committed when it exits.
+
+    Args:
+        db_name (str): Database name without extension, e.g. 'products'.
+
+    Returns:
+        contextmanager: Yields a pooled sqlite3.Connection.
+    """
+    return get_pool(DB_PATH/f'{db_name}.db').connection()
+
+GALLERY_COLUMNS = "id, media_url"
+
+def _gallery_entry(row: tuple) -> Dict:
+    """Convert a row of GALLERY_COLUMNS to a gallery dict."""
+    return {
+        "id": row[0],
+        "media_url": row[1]
+    }
+
+def _invalidate_catalog(db_name: str) -> None:
+    """Make this process' catalog snapshot check for the write on its next read."""
+    # Imported here, catalog.py builds on the helpers in this module
+    from .catalog import get_catalog
+    get_catalog(db_name).invalidate()
 
 def get_gallery() -> list[Dict]:
     """
@@ -15,20 +58,24 @@ def get_gallery() -> list[Dict]:
     Returns:
         list[Dict]: List of dictionaries with keys 'id' and 'media_url'.
     """
-    # Path relative to working directory 
-    conn = sqlite3.connect(DB_PATH/'gallery.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, media_url FROM gallery")
-    rows = cursor.fetchall()
-    conn.close()
+    # Path relative to working directory
+    with read_connection('gallery') as conn:
+        rows = conn.execute(f"SELECT {GALLERY_COLUMNS} FROM gallery").fetchall()
     # Convert rows to list of dicts
-    return [
-        {
-            "id": row[0],
-            "media_url": row[1]
-        }
-        for row in rows
-    ]
+    return [_gallery_entry(row) for row in rows]
+
+PRODUCT_COLUMNS = "id, name, brand, price, image_url, description"
+
+def _product(row: tuple) -> Dict:
+    """Convert a row of PRODUCT_COLUMNS to a product dict."""
+    return {
+        "id": row[0],
+        "name": row[1],
+        "brand": row[2],
+        "price": row[3],
+        "image_url": row[4],
+        "description": row[5]
+    }
 
 def get_products() -> list[Dict]:
     """
@@ -37,23 +84,54 @@ def get_products() -> list[Dict]:
     Returns:
         list[Dict]: List of dictionaries with product info.
     """
-    conn = sqlite3.connect(DB_PATH/'products.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name, brand, price, image_url, description FROM products")
-    rows = cursor.fetchall()
-    conn.close()
+    with read_connection('products') as conn:
+        rows = conn.execute(f"SELECT {PRODUCT_COLUMNS} FROM products").fetchall()
     # Convert rows to list of dicts
-    return [
-        {
-            "id": row[0],
-            "name": row[1],
-            "brand": row[2],
-            "price": row[3],
-            "image_url": row[4],
-            "description": row[5]
-        }
-        for row in rows
-    ]
+    return [_product(row) for row in rows]
+
+def get_product(product_id: int) -> Dict | None:
+    """
+    Retrieve one product by ID (primary key lookup).
+
+    Args:
+        product_id (int): ID of the product.
+
+    Returns:
+        Dict | None: Product info, or None if there is no product with this ID.
+    """
+    with read_connection('products') as conn:
+        row = conn.execute(f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = ?", (product_id,)).fetchone()
+    return _product(row) if row else None
+
+def get_products_by_ids(product_ids: list[int]) -> list[Dict]:
+    """
+    Retrieve several products by ID with one query.
+
+    Args:
+        product_ids (list[int]): IDs of the products.
+
+    Returns:
+        list[Dict]: Products in the order of `product_ids`, missing IDs are skipped.
+    """
+    if not product_ids:
+        return []
+    # The IDs are passed as one JSON array, so the statement is the same for any count
+    with read_connection('products') as conn:
+        rows = conn.execute(
+            f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps([int(i) for i in product_ids]),)).fetchall()
+    by_id = {row[0]: _product(row) for row in rows}
+    return [by_id[i] for i in map(int, product_ids) if i in by_id]
+
+def get_max_product_id() -> int:
+    """
+    Return the highest product ID.
+
+    Returns:
+        int: Highest ID, 0 if there are no products.
+    """
+    with read_connection('products') as conn:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM products").fetchone()[0]
 
 def add_product(product: Dict) -> None:
     """
@@ -62,15 +140,13 @@ def add_product(product: Dict) -> None:
     Args:
         product (Dict): Dictionary containing keys 'id', 'name', 'brand', 'price', 'description', 'image_url'.
     """
-    conn = sqlite3.connect(DB_PATH/'products.db')
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO products (id, name, brand, price, description, image_url)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (product["id"], product["name"], product["brand"], product["price"],
-          product["description"], product["image_url"]))
-    conn.commit()
-    conn.close()
+    with write_connection('products') as conn:
+        conn.execute("""
+            INSERT INTO products (id, name, brand, price, description, image_url)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (product["id"], product["name"], product["brand"], product["price"],
+              product["description"], product["image_url"]))
+    _invalidate_catalog('products')
 
 def delete_product(product_id: int) -> bool:
     """
@@ -82,10 +158,189 @@ def delete_product(product_id: int) -> bool:
     Returns:
         bool: True if a row was deleted, False otherwise.
     """
-    conn = sqlite3.connect(DB_PATH/'products.db')
-    c = conn.cursor()
-    c.execute("DELETE FROM products WHERE id = ?", (product_id,))
-    changed = c.rowcount
-    conn.commit()
-    conn.close()
+    with write_connection('products') as conn:
+        changed = conn.execute("DELETE FROM products WHERE id = ?", (product_id,)).rowcount
+    _invalidate_catalog('products')
     return changed > 0
+
+# --------------------------------------------------
+# Pages and streams
+# --------------------------------------------------
+# Keyset pagination: a page continues after the last id of the previous one,
+# so every page is one index range scan, however deep it is.
+# Table, columns and row converter of every list, keyed by database name. The
+# in-memory catalogs (see catalog.py) are built from the same entries.
+LISTS = {
+    "products": ("products", PRODUCT_COLUMNS, _product),
+    "gallery": ("gallery", GALLERY_COLUMNS, _gallery_entry),
+}
+
+def get_page(db_name: str, after_id: int = 0, limit: int = 50) -> list[Dict]:
+    """
+    Retrieve the entries with the next `limit` ids after `after_id`.
+
+    Args:
+        db_name (str): 'products' or 'gallery'.
+        after_id (int): Last id of the previous page, 0 for the first page.
+        limit (int): Maximum number of entries.
+
+    Returns:
+        list[Dict]: Entries in id order, the last id is the cursor of the next page.
+    """
+    table, columns, to_dict = LISTS[db_name]
+    with read_connection(db_name) as conn:
+        rows = conn.execute(f"SELECT {columns} FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                            (after_id, limit)).fetchall()
+    return [to_dict(row) for row in rows]
+
+def iter_entries(db_name: str, after_id: int = 0, fetch_size: int = 500):
+    """
+    Iterate over the entries in id order without loading them all.
+
+    The connection stays borrowed until the generator is exhausted or closed.
+
+    Args:
+        db_name (str): 'products' or 'gallery'.
+        after_id (int): Start after this id.
+        fetch_size (int): Rows fetched from SQLite at a time.
+
+    Yields:
+        list[Dict]: Up to `fetch_size` entries at a time.
+    """
+    table, columns, to_dict = LISTS[db_name]
+    with read_connection(db_name) as conn:
+        cursor = conn.execute(f"SELECT {columns} FROM {table} WHERE id > ? ORDER BY id", (after_id,))
+        while rows := cursor.fetchmany(fetch_size):
+            yield [to_dict(row) for row in rows]
+
+# --------------------------------------------------
+# Product search
+# --------------------------------------------------
+# Full-text index over name, brand and description. The trigram tokenizer
+# matches any substring of 3 or more characters (case-insensitive), like the
+# substring search it replaces. The index is an external-content table, the
+# triggers keep it in sync with products. `python -m src.migrate_db` creates
+# it, the server only checks that it is there.
+SEARCH_SCHEMA = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, brand, description, content='products', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name, brand, description)
+        VALUES (new.id, new.name, new.brand, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, brand, description)
+        VALUES ('delete', old.id, old.name, old.brand, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, brand, description)
+        VALUES ('delete', old.id, old.name, old.brand, old.description);
+        INSERT INTO products_fts (rowid, name, brand, description)
+        VALUES (new.id, new.name, new.brand, new.description);
+    END""",
+    "CREATE INDEX IF NOT EXISTS products_price ON products (price)",
+)
+
+# Names of the tables, triggers and indexes created by SEARCH_SCHEMA
+SEARCH_OBJECTS = ("products_fts", "products_fts_insert", "products_fts_delete", "products_fts_update",
+                  "products_price")
+
+# Largest integer SQLite stores, larger numeric queries only match as text
+SQLITE_MAX_INT = 2**63 - 1
+
+# Column weights of the ranking: a match in the name counts most
+SEARCH_RANK = "bm25(products_fts, 10.0, 5.0, 1.0)"
+
+_search_checked = False
+
+def create_search_index(conn) -> None:
+    """
+    Create the search index, its triggers and the price index if missing.
+    Migration step of products.db, an index created here is filled from the existing products.
+
+    Args:
+        conn (sqlite3.Connection): Connection to products.db in a transaction.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'").fetchone()
+    for statement in SEARCH_SCHEMA:
+        conn.execute(statement)
+    if not exists:
+        conn.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+def check_search_index() -> None:
+    """
+    Check that products.db has the search index (once per process).
+
+    Raises:
+        RuntimeError: If part of SEARCH_SCHEMA is missing.
+    """
+    global _search_checked
+    if _search_checked:
+        return
+    with read_connection('products') as conn:
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    missing = [name for name in SEARCH_OBJECTS if name not in names]
+    if missing:
+        raise RuntimeError(f"products.db has no {', '.join(missing)}, run `python -m src.migrate_db`")
+    _search_checked = True
+
+def search_products(q: str, limit: int = 50, offset: int = 0) -> list[Dict]:
+    """
+    Search products by name, brand and description, best matches first.
+
+    A query of 3 or more characters is looked up in the full-text index and
+    ranked with bm25. Shorter queries cannot use the trigram index and scan
+    the table instead. Both paths fold case with the Unicode rules, so 'Å'
+    finds 'Skål' either way. A numeric query also matches the product ID and
+    the price exactly (through the primary key and the price index), those
+    products come first.
+
+    Every match is ranked before the page is cut, so later pages continue the
+    same order and pagination runs through all matches.
+
+    Args:
+        q (str): Search text, matched as a case-insensitive substring.
+        limit (int): Maximum number of products returned.
+        offset (int): Number of matches to skip, for pagination.
+
+    Returns:
+        list[Dict]: Matching products.
+    """
+    q = q.strip()
+    if not q:
+        return []
+    check_search_index()
+
+    # ASCII digits only ('²' is a digit to isdigit but not to int), within SQLite's integer range
+    number = int(q) if q.isascii() and q.isdigit() else None
+    if number is not None and number > SQLITE_MAX_INT:
+        number = None
+    if len(q) >= 3:
+        # One quoted phrase: the whole query is matched as a substring
+        text_hits = f"SELECT rowid AS id, {SEARCH_RANK} AS rank FROM products_fts WHERE products_fts MATCH :match"
+    else:
+        text_hits = ("SELECT id, 0.0 AS rank FROM products WHERE instr(unicode_lower(name), :folded) "
+                     "OR instr(unicode_lower(brand), :folded) OR instr(unicode_lower(description), :folded)")
+
+    sql = f"""
+        WITH hits (id, rank) AS (
+            {text_hits}
+            UNION ALL
+            SELECT id, -1e300 FROM products WHERE id = :number OR price = :number
+        )
+        SELECT {PRODUCT_COLUMNS} FROM products
+        JOIN (SELECT id, MIN(rank) AS rank FROM hits GROUP BY id) USING (id)
+        ORDER BY rank, id
+        LIMIT :limit OFFSET :offset
+    """
+    params = {
+        "match": '"' + q.replace('"', '""') + '"',
+        "folded": q.lower(),
+        "number": number,
+        "limit": limit,
+        "offset": offset,
+    }
+    with read_connection('products') as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [_product(row) for row in rows]
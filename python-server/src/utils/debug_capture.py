@@ -0,0 +1,145 @@
+# python-server/src/utils/debug_capture.py
+import itertools
+import os
+import threading
+import time
+from pathlib import Path
+from queue import Queue, Full
+import numpy as np
+from PIL import Image
+from .logger import log
+from src.config import VERBOSE, DEBUG_CAPTURE, DEBUG_CAPTURE_SAMPLE_RATE, DEBUG_CAPTURE_BUFFER_SIZE
+
+class DebugCapture:
+    """
+    Opt-in, sampled and asynchronous saving of debug images.
+
+    When enabled, 1 in `sample_rate` requests gets a capture id. Images submitted
+    with that id are put on a bounded buffer and written to disk by a background
+    thread under request-scoped filenames. If the buffer is full the capture is
+    dropped, so requests never wait on PNG encoding or disk I/O.
+
+    Attributes:
+        enabled (bool): If False, no request is sampled.
+        sample_rate (int): Capture 1 in `sample_rate` requests.
+        buffer_size (int): Maximum number of captures waiting to be written.
+        verbose (bool): If True, prints debug messages.
+    """
+
+    def __init__(self, enabled: bool = False, sample_rate: int = 100,
+                 buffer_size: int = 64, verbose: bool = None):
+        """
+        Initialize the DebugCapture. The writer thread is started on first capture.
+
+        Args:
+            enabled (bool): Whether captures are taken at all.
+            sample_rate (int): Capture 1 in `sample_rate` requests (1 captures every request).
+            buffer_size (int): Maximum number of captures waiting to be written.
+            verbose (bool, optional): Whether to print debug messages. Defaults to VERBOSE from config.
+        """
+        self.enabled = enabled
+        self.sample_rate = max(1, int(sample_rate))
+        self.buffer_size = buffer_size
+        self.verbose = verbose if verbose is not None else VERBOSE
+
+        self._queue = Queue(maxsize=buffer_size)
+        self._requests = itertools.count()
+        self._writer = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.written = 0
+        self.dropped = 0
+
+    def sample(self) -> str | None:
+        """
+        Decide whether the current request is captured.
+
+        Returns:
+            str | None: A unique capture id, or None if the request is not captured.
+        """
+        if not self.enabled:
+            return None
+        n = next(self._requests)
+        if n % self.sample_rate:
+            return None
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{n}"
+
+    def submit(self, path: Path, image) -> bool:
+        """
+        Queue an image to be saved without blocking.
+
+        Args:
+            path (Path): Destination file.
+            image (Image.Image | np.ndarray): Image to save. The image is copied,
+                so the caller may keep using or reusing it.
+
+        Returns:
+            bool: True if queued, False if dropped because the buffer is full.
+        """
+        # Copy so the writer thread never shares a (lazily loaded) image or buffer
+        image = image.copy()
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((Path(path), image))
+        except Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def stats(self) -> dict:
+        """
+        Return capture counters.
+
+        Returns:
+            dict: Pending, written and dropped captures.
+        """
+        with self._lock:
+            return {"pending": self._queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+    def _ensure_writer(self):
+        """Start the writer thread if it is not running (e.g. after a fork)."""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="DebugCapture", daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        """Writer loop: encode and save queued images one at a time."""
+        while True:
+            path, image = self._queue.get()
+            try:
+                if isinstance(image, np.ndarray):
+                    image = Image.fromarray(image)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                image.save(path)
+                with self._lock:
+                    self.written += 1
+                log(f"Debug image saved to {path}", caller="DebugCapture", verbose=self.verbose)
+            except Exception as e:
+                log(f"Failed to save debug image {path}: {e}", caller="DebugCapture", verbose=True)
+
+_default_capture = None
+_default_lock = threading.Lock()
+
+def get_debug_capture() -> DebugCapture:
+    """
+    Return the process-wide DebugCapture configured from src/config.py.
+
+    Returns:
+        DebugCapture: Shared instance.
+    """
+    global _default_capture
+    if _default_capture is None:
+        with _default_lock:
+            if _default_capture is None:
+                _default_capture = DebugCapture(
+                    enabled=DEBUG_CAPTURE,
+                    sample_rate=DEBUG_CAPTURE_SAMPLE_RATE,
+                    buffer_size=DEBUG_CAPTURE_BUFFER_SIZE
+                )
+    return _default_capture
@@ -0,0 +1,146 @@
+# python-server/src/utils/linear_model.py
+import numpy as np
+from pathlib import Path
+from .model_store import replace_file
+
+class LinearSoftmax:
+    """
+    Pure-NumPy float32 inference for a trained LogisticRegression.
+
+    A single `predict_proba` call on the sklearn model spends most of its time in
+    input validation and dispatch, the model itself is one (784 x 10) matmul
+    followed by a softmax. The coefficients are stored as float32 in a compact
+    `.npz` file and the kernel is kept transposed, so a prediction is `x @ W + b`.
+
+    Attributes:
+        model_name (str): Name used by Predictor for logging.
+        coef_ (np.ndarray): Coefficients (shape: (n_classes, n_features)), float32.
+        intercept_ (np.ndarray): Intercepts (shape: (n_classes,)), float32.
+        classes_ (np.ndarray): Class labels, same as the original model.
+        multi_class (str): 'multinomial' (softmax) or 'ovr' (normalized sigmoids).
+    """
+
+    model_name = "logistic_regression"
+
+    MULTI_CLASS = ("multinomial", "ovr")
+
+    def __init__(self, coef, intercept, classes, multi_class: str = "multinomial"):
+        """
+        Initialize the LinearSoftmax.
+
+        Args:
+            coef (np.ndarray): Coefficients (shape: (n_classes, n_features)).
+            intercept (np.ndarray): Intercepts (shape: (n_classes,)).
+            classes (np.ndarray): Class labels.
+            multi_class (str): 'multinomial' or 'ovr'.
+
+        Raises:
+            ValueError: If the shapes do not line up or multi_class is unsupported.
+        """
+        if multi_class not in self.MULTI_CLASS:
+            raise ValueError(f"Unsupported multi_class '{multi_class}'")
+        coef = np.asarray(coef, dtype=np.float32)
+        if coef.ndim != 2 or coef.shape[0] < 3 or coef.shape[0] != len(intercept) or coef.shape[0] != len(classes):
+            raise ValueError("Expected one coefficient row and intercept per class (at least 3 classes)")
+
+        self.coef_ = coef
+        self.intercept_ = np.ascontiguousarray(intercept, dtype=np.float32)
+        self.classes_ = np.asarray(classes)
+        self.multi_class = multi_class
+        # Transposed once, so the forward pass is a plain (N, F) @ (F, C)
+        self._kernel = np.ascontiguousarray(coef.T)
+
+    @classmethod
+    def from_sklearn(cls, model) -> "LinearSoftmax":
+        """
+        Extract the coefficients of a fitted multi-class LogisticRegression.
+
+        Args:
+            model: Fitted sklearn LogisticRegression.
+
+        Returns:
+            LinearSoftmax: Model with the same (float32) predictions.
+        """
+        multi_class = "ovr" if getattr(model, "multi_class", "auto") == "ovr" else "multinomial"
+        return cls(model.coef_, model.intercept_, model.classes_, multi_class)
+
+    @classmethod
+    def load(cls, path) -> "LinearSoftmax":
+        """
+        Load a model saved with `save`.
+
+        Args:
+            path (str | Path): Path to the `.npz` file.
+
+        Returns:
+            LinearSoftmax: Loaded model.
+        """
+        with np.load(Path(path)) as f:
+            return cls(f["coef"], f["intercept"], f["classes"], str(f["multi_class"]))
+
+    def save(self, path) -> Path:
+        """
+        Save the coefficients as float32 arrays in a `.npz` file.
+        The file is replaced, not rewritten, so running servers keep their copy.
+
+        Args:
+            path (str | Path): Destination file.
+
+        Returns:
+            Path: Path to the saved file.
+        """
+        return replace_file(path, lambda f: np.savez(f, coef=self.coef_, intercept=self.intercept_,
+                                                     classes=self.classes_,
+                                                     multi_class=np.array(self.multi_class)))
+
+    def decision_function(self, data: np.ndarray) -> np.ndarray:
+        """
+        Compute the class scores `x @ coef.T + intercept`.
+
+        Args:
+            data (np.ndarray): Input data (shape: (N, n_features)).
+
+        Returns:
+            np.ndarray: Scores (shape: (N, n_classes)), float32.
+        """
+        x = np.asarray(data, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[np.newaxis, :]
+        scores = x @ self._kernel
+        scores += self.intercept_
+        return scores
+
+    def predict_proba(self, data: np.ndarray) -> np.ndarray:
+        """
+        Predict class probabilities.
+
+        Args:
+            data (np.ndarray): Input data (shape: (N, n_features)).
+
+        Returns:
+            np.ndarray: Class probabilities (shape: (N, n_classes)), float32.
+        """
+        scores = self.decision_function(data)
+        if self.multi_class == "multinomial":
+            scores -= scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+        else:
+            # One-vs-rest: independent sigmoids, normalized like sklearn does
+            np.negative(scores, out=scores)
+            np.exp(scores, out=scores)
+            scores += 1.0
+            np.reciprocal(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, data: np.ndarray) -> np.ndarray:
+        """
+        Predict class labels.
+
+        Args:
+            data (np.ndarray): Input data (shape: (N, n_features)).
+
+        Returns:
+            np.ndarray: Class label per row.
+        """
+        return self.classes_.take(self.decision_function(data).argmax(axis=1))
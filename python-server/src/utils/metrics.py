@@ -0,0 +1,286 @@
+# python-server/src/utils/metrics.py
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from .logger import log
+from src.config import (
+    VERBOSE,
+    METRICS_ENABLED,
+    METRICS_BUCKETS,
+    METRICS_MULTIPROCESS,
+    METRICS_DIR,
+    METRICS_SNAPSHOT_INTERVAL,
+)
+
+# Route of the request being served, set by the app before each request
+_route = ContextVar("metrics_route", default="")
+
+HELP = {
+    "predict_stage_seconds": "Time spent in each stage of a prediction request.",
+    "http_request_seconds": "Time spent serving each request.",
+}
+
+class Metrics:
+    """
+    In-process latency histograms with Prometheus text output.
+
+    Each series is a histogram (bucket counts, sum and count) identified by a
+    metric name and its labels. Observations from a request carry the route
+    set with `set_route`, so one stage can be told apart per endpoint.
+
+    With `multiprocess`, a background thread writes a snapshot of this process
+    to `<snapshot_dir>/metrics.<pid>.json` every `snapshot_interval` seconds and
+    `render` adds up the snapshots of all running processes, so any worker can
+    answer for all of them. Snapshots of processes that are gone are removed,
+    their counts start over like after a restart.
+
+    Attributes:
+        enabled (bool): If False, nothing is recorded.
+        buckets (tuple): Upper bounds of the histogram buckets in seconds.
+        multiprocess (bool): Share snapshots between worker processes.
+        snapshot_dir (Path): Directory of the per-process snapshots.
+        snapshot_interval (float): Seconds between snapshots.
+        verbose (bool): If True, prints debug messages.
+    """
+
+    def __init__(self, enabled: bool = True, buckets: tuple = (0.001, 0.01, 0.1, 1.0),
+                 multiprocess: bool = False, snapshot_dir: str = "./logs/metrics",
+                 snapshot_interval: float = 5.0, verbose: bool = None):
+        """
+        Initialize the Metrics. The snapshot thread is started on first observation.
+
+        Args:
+            enabled (bool): Whether anything is recorded.
+            buckets (tuple): Upper bounds of the histogram buckets in seconds, ascending.
+            multiprocess (bool): Share snapshots between worker processes.
+            snapshot_dir (str): Directory of the per-process snapshots.
+            snapshot_interval (float): Seconds between snapshots.
+            verbose (bool, optional): Whether to print debug messages. Defaults to VERBOSE from config.
+        """
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self.multiprocess = multiprocess
+        self.snapshot_dir = Path(snapshot_dir)
+        self.snapshot_interval = snapshot_interval
+        self.verbose = verbose if verbose is not None else VERBOSE
+
+        # (name, labels) -> [bucket counts (last one is +Inf), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+        self._writer = None
+
+    @staticmethod
+    def set_route(route: str):
+        """
+        Set the route label for observations made while serving this request.
+
+        Args:
+            route (str): Route rule, e.g. "/api/predict".
+
+        Returns:
+            contextvars.Token: Token to reset the route with.
+        """
+        return _route.set(route)
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """
+        Record one duration.
+
+        Args:
+            name (str): Metric name, e.g. "predict_stage_seconds".
+            seconds (float): Duration.
+            **labels: Label values, the current route is added as `route`.
+        """
+        if not self.enabled:
+            return
+        labels.setdefault("route", _route.get())
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+        if self.multiprocess:
+            self._ensure_writer()
+
+    @contextmanager
+    def time(self, stage: str, **labels):
+        """
+        Time the body of a with-block as a prediction stage.
+
+        Args:
+            stage (str): Stage name, e.g. "png_decode".
+            **labels: Extra labels, e.g. model.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("predict_stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+    def snapshot(self) -> list:
+        """
+        Return a copy of all series of this process.
+
+        Returns:
+            list[dict]: name, labels, buckets (non-cumulative counts), sum and count per series.
+        """
+        with self._lock:
+            return [
+                {"name": name, "labels": dict(labels), "buckets": list(counts), "sum": total, "count": count}
+                for (name, labels), (counts, total, count) in self._series.items()
+            ]
+
+    def collect(self) -> list:
+        """
+        Return the series of this process, added up with all other running processes
+        when multiprocess is enabled.
+
+        Returns:
+            list[dict]: Series as returned by `snapshot`.
+        """
+        merged = {}
+        snapshots = [self.snapshot()]
+        if self.multiprocess:
+            snapshots += self._read_snapshots()
+
+        for snapshot in snapshots:
+            for series in snapshot:
+                key = (series["name"], tuple(sorted(series["labels"].items())))
+                if len(series["buckets"]) != len(self.buckets) + 1:
+                    continue  # Written with other buckets, cannot be added up
+                total = merged.get(key)
+                if total is None:
+                    merged[key] = {**series, "buckets": list(series["buckets"])}
+                else:
+                    total["buckets"] = [a + b for a, b in zip(total["buckets"], series["buckets"])]
+                    total["sum"] += series["sum"]
+                    total["count"] += series["count"]
+        return [merged[key] for key in sorted(merged)]
+
+    def render(self) -> str:
+        """
+        Render all series in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text, one cumulative histogram per series.
+        """
+        lines = []
+        current = None
+        for series in self.collect():
+            name = series["name"]
+            if name != current:
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                current = name
+
+            labels = ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(series["labels"].items()))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {series['sum']}")
+            lines.append(f"{name}_count{{{labels}}} {series['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self) -> Path:
+        """
+        Write this process' snapshot atomically to `<snapshot_dir>/metrics.<pid>.json`.
+
+        Returns:
+            Path: Path to the snapshot file.
+        """
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        path = self.snapshot_dir / f"metrics.{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, path)
+        return path
+
+    def _read_snapshots(self) -> list:
+        """Read the snapshots of the other running processes, removing those of exited ones."""
+        snapshots = []
+        for path in self.snapshot_dir.glob("metrics.*.json"):
+            try:
+                pid = int(path.name.split(".")[1])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            if not _is_running(pid):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError) as e:
+                log(f"Skipping unreadable snapshot {path}: {e}", caller="Metrics", verbose=self.verbose)
+        return snapshots
+
+    def _ensure_writer(self):
+        """Start the snapshot thread if it is not running (e.g. after a fork)."""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="MetricsSnapshot", daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        """Snapshot loop."""
+        while True:
+            time.sleep(self.snapshot_interval)
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                log(f"Failed to write metrics snapshot: {e}", caller="Metrics", verbose=True)
+
+def _escape(value) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _is_running(pid: int) -> bool:
+    """Return True if a process with this pid exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+_default_metrics = None
+_default_lock = threading.Lock()
+
+def get_metrics() -> Metrics:
+    """
+    Return the process-wide Metrics configured from src/config.py.
+
+    Returns:
+        Metrics: Shared instance.
+    """
+    global _default_metrics
+    if _default_metrics is None:
+        with _default_lock:
+            if _default_metrics is None:
+                _default_metrics = Metrics(
+                    enabled=METRICS_ENABLED,
+                    buckets=METRICS_BUCKETS,
+                    multiprocess=METRICS_MULTIPROCESS,
+                    snapshot_dir=METRICS_DIR,
+                    snapshot_interval=METRICS_SNAPSHOT_INTERVAL
+                )
+    return _default_metrics
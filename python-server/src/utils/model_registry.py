@@ -0,0 +1,301 @@
+# python-server/src/utils/model_registry.py
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from .logger import log
+from .models import LazyModels, MODELS_DIR, model_loaders
+from .predict import Predictor
+from .startup import STARTUP
+
+# Artifact file name (without extension) of each served model
+MODEL_FILES = {
+    "logistic_regression": "LogisticRegression",
+    "random_forest": "RandomForest",
+    "neural_network": "NeuralNetwork",
+}
+
+# Version name of the unversioned files directly in models/
+BASE_VERSION = "base"
+
+def versions_dir(models_dir: Path = MODELS_DIR) -> Path:
+    """Return the directory holding the published model versions."""
+    return Path(models_dir) / "versions"
+
+def publish_version(file_name: str, paths: list, models_dir: Path = MODELS_DIR, version: str = None) -> Path:
+    """
+    Publish model artifacts as a new version in `models/versions/<file_name>/<version>/`.
+
+    The files are copied into a hidden temporary directory that is renamed into
+    place once complete, so a watching server never sees a half-written version.
+    They are copies rather than hard links because training and export rewrite
+    the working files, which must not change a published version.
+
+    Args:
+        file_name (str): Artifact name, e.g. "LogisticRegression".
+        paths (list): Files or directories to publish, e.g. the `.joblib` and `.npz`
+            files. Directories are published under their name relative to models_dir
+            (e.g. `store/RandomForest`).
+        models_dir (Path): Models directory.
+        version (str, optional): Version name. Defaults to the current time
+            (`%Y%m%d-%H%M%S`), which sorts in publishing order.
+
+    Returns:
+        Path: Directory of the published version.
+
+    Raises:
+        FileExistsError: If the version already exists.
+    """
+    models_dir = Path(models_dir)
+    version = version or datetime.now().strftime("%Y%m%d-%H%M%S")
+    target = versions_dir(models_dir) / file_name / version
+    if target.exists():
+        raise FileExistsError(f"Version {version} of {file_name} already exists")
+
+    tmp = target.with_name(f".{version}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    for path in map(Path, paths):
+        try:
+            relative = path.resolve().relative_to(models_dir.resolve())
+        except ValueError:
+            relative = Path(path.name)
+        destination = tmp / relative
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if path.is_dir():
+            shutil.copytree(path, destination)
+        else:
+            shutil.copy2(path, destination)
+
+    os.replace(tmp, target)
+    log(f"Published {file_name} version {version}", caller="Registry", verbose=True)
+    return target
+
+class ModelRegistry(LazyModels):
+    """
+    Lazily loaded models that can be replaced by newer versions while serving.
+
+    Versions are directories `models/versions/<file_name>/<version>/` holding the
+    same artifacts as `models/` (see `publish_version`), the files directly in
+    `models/` are the version "base". A model is first loaded from its newest
+    version. `reload` (called by the admin endpoint or the watcher thread) loads
+    a version in the background, runs one prediction to warm it up and only
+    then swaps it in. The model and its version are swapped as one entry, so a
+    request always sees a consistent pair and requests already running keep
+    using the model they started with. If a version fails to load, the current
+    one stays active.
+
+    Attributes:
+        models_dir (Path): Models directory.
+        verbose (bool): If True, prints log messages.
+    """
+
+    def __init__(self, models_dir: Path = MODELS_DIR, verbose: bool = True):
+        """
+        Initialize the ModelRegistry. Nothing is loaded until first use or `warm_up`.
+
+        Args:
+            models_dir (Path): Models directory.
+            verbose (bool): If True, prints log messages.
+        """
+        self.models_dir = Path(models_dir)
+        # Loading goes through `active`, the base class provides the names, locks and warm_up
+        super().__init__(loaders={name: None for name in MODEL_FILES}, verbose=verbose)
+        self._entries = {}
+        self._reloading = set()
+        self._pinned = {}
+        self._failed = {}
+        self._state_lock = threading.Lock()
+        self._watcher = None
+        self._watch_interval = 0.0
+
+    def __getitem__(self, name: str):
+        return self.active(name)[0]
+
+    def is_loaded(self, name: str) -> bool:
+        """Return True if a version of the model has been loaded."""
+        return name in self._entries
+
+    def versions(self, name: str) -> list[str]:
+        """
+        Return the available versions of a model, oldest first.
+
+        Args:
+            name (str): Model name, e.g. "logistic_regression".
+
+        Returns:
+            list[str]: "base" followed by the published versions.
+        """
+        path = versions_dir(self.models_dir) / MODEL_FILES[name]
+        published = sorted(p.name for p in path.iterdir() if p.is_dir() and not p.name.startswith(".")) \
+            if path.is_dir() else []
+        return [BASE_VERSION] + published
+
+    def latest_version(self, name: str) -> str:
+        """Return the newest available version of a model."""
+        return self.versions(name)[-1]
+
+    def version(self, name: str) -> str | None:
+        """Return the active version of a model, or None if it is not loaded yet."""
+        entry = self._entries.get(name)
+        return entry[1] if entry else None
+
+    def active(self, name: str) -> tuple:
+        """
+        Return the active model and its version, loading the newest version on first use.
+
+        Args:
+            name (str): Model name.
+
+        Returns:
+            tuple: (model, version).
+
+        Raises:
+            KeyError: If the model name is unknown.
+        """
+        entry = self._entries.get(name)
+        if entry is not None:
+            return entry
+        if name not in MODEL_FILES:
+            raise KeyError(name)
+
+        # One lock per model, concurrent first requests load it only once
+        with self._locks[name]:
+            if name not in self._entries:
+                version = self.latest_version(name)
+                log(f"Loading {name} version {version}...", caller="Registry", verbose=self.verbose)
+                with STARTUP.measure("load", name):
+                    model = self._load_version(name, version)
+                self._entries[name] = (model, version)
+                log(f"Loaded {name} version {version} in {STARTUP.loads[name] * 1000:.0f} ms",
+                    caller="Registry", verbose=self.verbose)
+        return self._entries[name]
+
+    def reload(self, name: str = None, version: str = None, background: bool = True) -> dict:
+        """
+        Load a version of one or all models and swap it in once it is warmed up.
+
+        Args:
+            name (str, optional): Model name, all models if None.
+            version (str, optional): Version to activate (e.g. to roll back),
+                defaults to the newest version. Requires `name`. A selected
+                version is pinned, the watcher leaves the model alone until it
+                is reloaded without a version.
+            background (bool): If True, load on daemon threads and return immediately.
+
+        Returns:
+            dict: Model name -> version being loaded, for models that change.
+
+        Raises:
+            KeyError: If the model name is unknown.
+            ValueError: If the version does not exist or is given without a name.
+        """
+        if version is not None and name is None:
+            raise ValueError("A version can only be selected for a single model")
+        if name is not None and name not in MODEL_FILES:
+            raise KeyError(name)
+
+        scheduled = {}
+        for model_name in ([name] if name else list(MODEL_FILES)):
+            target = version or self.latest_version(model_name)
+            if target not in self.versions(model_name):
+                raise ValueError(f"Unknown version '{target}' of {model_name}")
+            with self._state_lock:
+                if version is not None:
+                    self._pinned[model_name] = version
+                else:
+                    self._pinned.pop(model_name, None)
+                if target == self.version(model_name) or model_name in self._reloading:
+                    continue
+                self._reloading.add(model_name)
+            scheduled[model_name] = target
+
+            if background:
+                threading.Thread(target=self._swap, args=(model_name, target),
+                                 name=f"ModelReload-{model_name}", daemon=True).start()
+            else:
+                self._swap(model_name, target)
+        return scheduled
+
+    def watch(self, interval: float) -> None:
+        """
+        Start (or restart, e.g. after a fork) the thread that reloads new versions.
+
+        Args:
+            interval (float): Seconds between checks, 0 disables watching.
+        """
+        self._watch_interval = interval
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        with self._state_lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name="ModelWatcher", daemon=True)
+                self._watcher.start()
+
+    def status(self) -> dict:
+        """
+        Return the version state of every model.
+
+        Returns:
+            dict: Model name -> active, latest and available versions, whether the
+                  version is pinned and whether a reload is running.
+        """
+        return {
+            name: {
+                "active": self.version(name),
+                "latest": self.latest_version(name),
+                "versions": self.versions(name),
+                "pinned": name in self._pinned,
+                "reloading": name in self._reloading,
+            }
+            for name in MODEL_FILES
+        }
+
+    def _load_version(self, name: str, version: str):
+        """Load one version of a model from its directory."""
+        directory = self.models_dir
+        if version != BASE_VERSION:
+            directory = versions_dir(self.models_dir) / MODEL_FILES[name] / version
+        return model_loaders(directory, verbose=self.verbose)[name]()
+
+    def _swap(self, name: str, version: str) -> None:
+        """Load and warm up a version, then make it the active one."""
+        try:
+            start = time.perf_counter()
+            with self._locks[name]:
+                model = self._load_version(name, version)
+                # First prediction pays one-time costs (lazy imports, page faults on mmaps)
+                Predictor.predict_batch(model, np.zeros((1, 784), dtype=np.float32))
+                previous = self.version(name)
+                self._entries[name] = (model, version)
+            self._failed.pop(name, None)
+            log(f"Swapped {name} from version {previous} to {version} "
+                f"in {(time.perf_counter() - start) * 1000:.0f} ms", caller="Registry", verbose=True)
+        except Exception as e:
+            self._failed[name] = version
+            log(f"Reload of {name} version {version} failed, keeping version {self.version(name)}: {e}",
+                caller="Registry", verbose=True)
+        finally:
+            with self._state_lock:
+                self._reloading.discard(name)
+
+    def _watch(self) -> None:
+        """Watcher loop: reload models whose newest version is not the active one."""
+        while self._watch_interval > 0:
+            time.sleep(self._watch_interval)
+            for name in MODEL_FILES:
+                # Models that were never loaded pick up the newest version on first
+                # use, pinned models stay on the version selected by an admin
+                if not self.is_loaded(name) or name in self._pinned:
+                    continue
+                try:
+                    # A version that failed to load is only retried through `reload`
+                    if self.latest_version(name) == self._failed.get(name):
+                        continue
+                    self.reload(name, background=False)
+                except Exception as e:
+                    log(f"Checking {name} for new versions failed: {e}", caller="Registry", verbose=True)
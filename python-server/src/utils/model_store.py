@@ -0,0 +1,149 @@
+# python-server/src/utils/model_store.py
+import json
+import os
+from pathlib import Path
+import numpy as np
+
+# Memory-mappable array exports of the models live next to the originals
+STORE_DIR = Path(__file__).resolve().parent.parent.parent / "models" / "store"
+
+def replace_file(path, write) -> Path:
+    """
+    Write a file under a temporary name and rename it into place.
+
+    The rename gives the file a new inode, so a process that has the old file
+    memory-mapped keeps reading the old data instead of a half-written or
+    truncated file, and a reader never opens a partly written one.
+
+    Args:
+        path (str | Path): Destination file.
+        write (callable): Called with a binary file object to write the content.
+
+    Returns:
+        Path: Path to the written file.
+    """
+    path = Path(path)
+    tmp = _temp_path(path)
+    try:
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
+
+def save_arrays(name: str, arrays: dict, meta: dict = None, store_dir: Path = STORE_DIR) -> Path:
+    """
+    Save a model as a directory of `.npy` arrays plus a `meta.json`.
+
+    Used by the array-based inference engines (e.g. CompiledForest), whose
+    arrays can be memory-mapped directly without unpickling. Every file is
+    written under a temporary name first and all of them are renamed into
+    place at the end, so workers that have the previous arrays memory-mapped
+    keep their copy intact (see `replace_file`).
+
+    Args:
+        name (str): Directory name, e.g. "RandomForest".
+        arrays (dict): Array name -> np.ndarray.
+        meta (dict, optional): JSON-serializable metadata.
+        store_dir (Path): Store directory.
+
+    Returns:
+        Path: Path to the model directory.
+    """
+    path = Path(store_dir) / name
+    path.mkdir(parents=True, exist_ok=True)
+    staged = []
+    try:
+        for key, array in arrays.items():
+            tmp = _temp_path(path / f"{key}.npy")
+            staged.append((tmp, path / f"{key}.npy"))
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+        tmp = _temp_path(path / "meta.json")
+        staged.append((tmp, path / "meta.json"))
+        with open(tmp, "w") as f:
+            json.dump({"arrays": list(arrays), **(meta or {})}, f, indent=2)
+
+        # meta.json is renamed last, its mtime marks when the export finished
+        for tmp, final in staged:
+            os.replace(tmp, final)
+    finally:
+        for tmp, _ in staged:
+            tmp.unlink(missing_ok=True)
+    return path
+
+def load_arrays(name: str, store_dir: Path = STORE_DIR, mmap_mode: str = "r") -> tuple:
+    """
+    Load arrays saved with `save_arrays`.
+
+    Args:
+        name (str): Directory name.
+        store_dir (Path): Store directory.
+        mmap_mode (str | None): Mode passed to `np.load`, None reads into memory.
+
+    Returns:
+        tuple: (arrays dict, meta dict).
+    """
+    path = Path(store_dir) / name
+    with open(path / "meta.json") as f:
+        meta = json.load(f)
+    # asarray drops the memmap subclass, the data stays mapped
+    arrays = {key: np.asarray(np.load(path / f"{key}.npy", mmap_mode=mmap_mode)) for key in meta["arrays"]}
+    return arrays, meta
+
+def arrays_mtime(name: str, store_dir: Path = STORE_DIR) -> float | None:
+    """
+    Return when an array model was saved, or None if it does not exist.
+
+    Args:
+        name (str): Directory name.
+        store_dir (Path): Store directory.
+
+    Returns:
+        float | None: Modification time of its meta.json.
+    """
+    meta_path = Path(store_dir) / name / "meta.json"
+    return meta_path.stat().st_mtime if meta_path.exists() else None
+
+def _temp_path(path: Path) -> Path:
+    """Return a hidden temporary name next to `path`, unique per process."""
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+def memory_usage(pid: int = None) -> dict | None:
+    """
+    Report resident memory of a process, split into unique and shared pages.
+
+    Unique memory (private clean + private dirty pages) is what a worker costs on
+    its own, shared pages (model mmaps, copy-on-write pages from a preloading
+    parent) are paid once for all workers.
+
+    Args:
+        pid (int, optional): Process id. Defaults to the current process.
+
+    Returns:
+        dict | None: rss_mb, unique_mb and shared_mb, or None if /proc is not available.
+    """
+    pid = pid or os.getpid()
+    fields = {}
+    for filename in ("smaps_rollup", "smaps"):
+        try:
+            with open(f"/proc/{pid}/{filename}") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 3 and parts[2] == "kB":
+                        fields[parts[0]] = fields.get(parts[0], 0) + int(parts[1])
+            break
+        except OSError:
+            continue
+
+    if not fields:
+        return None
+
+    kb = lambda *keys: sum(fields.get(key, 0) for key in keys)
+    return {
+        "pid": pid,
+        "rss_mb": kb("Rss:") / 1024,
+        "unique_mb": kb("Private_Clean:", "Private_Dirty:") / 1024,
+        "shared_mb": kb("Shared_Clean:", "Shared_Dirty:") / 1024,
+    }
@@ -9,6 +9,10 @@ from tensorflow.keras.callbacks import CSVLogger
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from joblib import dump
+from .numpy_mlp import NumpyMLP
+from .linear_model import LinearSoftmax
+from .compiled_forest import CompiledForest
+from .model_registry import publish_version
 
 class ModelTrainer:
     """
@@ -144,6 +148,18 @@ class ModelTrainer:
 
             file_path = os.path.join("models", f"{self.full_name}.joblib")
             dump(self.model, file_path)
+            artifacts = [file_path]
+
+            if self.full_name == "LogisticRegression":
+                # Export sklearn-free float32 coefficients for serving
+                npz_path = LinearSoftmax.from_sklearn(self.model).save(os.path.join("models", f"{self.full_name}.npz"))
+                artifacts.append(npz_path)
+                self.logger.info(f"NumPy coefficients exported to {npz_path}")
+            else:
+                # Export the forest as flat node arrays, served without sklearn
+                forest_dir = CompiledForest.from_sklearn(self.model).save(self.full_name, os.path.join("models", "store"))
+                artifacts.append(forest_dir)
+                self.logger.info(f"Compiled forest exported to {forest_dir}")
 
         else:  # NeuralNetwork
             csv_logger = CSVLogger(self.LOG_FILENAMES[self.full_name])
@@ -166,6 +182,15 @@ class ModelTrainer:
             file_path = os.path.join("models", f"{self.full_name}.h5")
             self.model.save(file_path)
 
+            # Export TensorFlow-free weights for serving
+            npz_path = NumpyMLP.from_keras(self.model).save(os.path.join("models", f"{self.full_name}.npz"))
+            artifacts = [file_path, npz_path]
+            self.logger.info(f"NumPy weights exported to {npz_path}")
+
+        # Running servers pick up the new version without a restart
+        version_dir = publish_version(self.full_name, artifacts, models_dir="models")
+        self.logger.info(f"Published as version {version_dir.name}")
+
         self.is_trained = True
         self.logger.info(f"Training finished. Model saved to {file_path}")
         return file_path
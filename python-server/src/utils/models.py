@@ -1,15 +1,157 @@
-import joblib
-from tensorflow.keras.models import load_model as keras_load_model
+import threading
+from collections.abc import Mapping
 from pathlib import Path
 from .logger import log
+from .numpy_mlp import NumpyMLP
+from .model_store import arrays_mtime
+from .compiled_forest import CompiledForest
+from .linear_model import LinearSoftmax
+from .startup import STARTUP
+from src.config import MODELS_MMAP
+
+# Get project root (one level above src)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+MODELS_DIR = PROJECT_ROOT / "models"
+
+def model_loaders(models_dir: Path = MODELS_DIR, verbose: bool = True) -> dict:
+    """
+    Return a function per model name that loads the model from disk.
+
+    LogisticRegression and RandomForest are served by their NumPy exports
+    (LinearSoftmax, CompiledForest) when there is an up-to-date one, the
+    compiled forest is memory-mapped from `models/store` when MODELS_MMAP is set.
+    Otherwise the scikit-learn model is unpickled from its `.joblib` file.
+
+    Args:
+        models_dir (Path): Directory containing the model files.
+        verbose (bool): If True, prints log messages.
+
+    Returns:
+        dict: Model name -> zero-argument load function.
+    """
+    def load_joblib(name):
+        # joblib (and sklearn, when unpickling) is only imported when a model is loaded
+        import joblib
+        return joblib.load(models_dir / f"{name}.joblib")
+
+    def load_logistic_regression():
+        # Prefer the float32 NumPy export if it is up to date
+        path = models_dir / "LogisticRegression.joblib"
+        npz_path = models_dir / "LogisticRegression.npz"
+        if npz_path.exists() and (not path.exists() or npz_path.stat().st_mtime >= path.stat().st_mtime):
+            log(f"Loading NumPy logistic regression from {npz_path}", caller="Loader", verbose=verbose)
+            return LinearSoftmax.load(npz_path)
+        return load_joblib("LogisticRegression")
+
+    def load_random_forest():
+        # Prefer the compiled forest if it is up to date, it needs no sklearn at all
+        path = models_dir / "RandomForest.joblib"
+        compiled_mtime = arrays_mtime("RandomForest", models_dir / "store")
+        if compiled_mtime is not None and (not path.exists() or compiled_mtime >= path.stat().st_mtime):
+            log("Loading compiled RandomForest from the model store", caller="Loader", verbose=verbose)
+            return CompiledForest.load("RandomForest", models_dir / "store", mmap_mode="r" if MODELS_MMAP else None)
+        return load_joblib("RandomForest")
+
+    return {
+        # ---- scikit-learn / classical ML models ----
+        "logistic_regression": lambda: load_logistic_regression(),
+        "random_forest": lambda: load_random_forest(),
+        # ---- neural network (NumPy export or Keras / TensorFlow) ----
+        "neural_network": lambda: load_neural_network(models_dir, verbose=verbose),
+    }
+
+class LazyModels(Mapping):
+    """
+    Read-only mapping of model name to model that loads each model on first use.
+
+    Iterating over the names or checking membership does not load anything.
+    `warm_up` loads all models, optionally on a background thread, so the first
+    requests do not pay the load time.
+
+    Attributes:
+        verbose (bool): If True, prints log messages.
+    """
+
+    def __init__(self, loaders: dict = None, verbose: bool = True):
+        """
+        Initialize the LazyModels.
+
+        Args:
+            loaders (dict, optional): Model name -> zero-argument load function.
+                Defaults to `model_loaders()`.
+            verbose (bool): If True, prints log messages.
+        """
+        self.verbose = verbose
+        self._loaders = loaders if loaders is not None else model_loaders(verbose=verbose)
+        self._models = {}
+        self._locks = {name: threading.Lock() for name in self._loaders}
+
+    def __getitem__(self, name: str):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self._loaders:
+            raise KeyError(name)
+
+        # One lock per model, concurrent first requests load it only once
+        with self._locks[name]:
+            if name not in self._models:
+                log(f"Loading {name}...", caller="Loader", verbose=self.verbose)
+                with STARTUP.measure("load", name):
+                    self._models[name] = self._loaders[name]()
+                log(f"Loaded {name} in {STARTUP.loads[name] * 1000:.0f} ms", caller="Loader", verbose=self.verbose)
+        return self._models[name]
+
+    def __iter__(self):
+        return iter(self._loaders)
+
+    def __len__(self):
+        return len(self._loaders)
+
+    def __contains__(self, name):
+        return name in self._loaders
+
+    def is_loaded(self, name: str) -> bool:
+        """Return True if the model has been loaded."""
+        return name in self._models
+
+    def warm_up(self, background: bool = True) -> threading.Thread | None:
+        """
+        Load all models now.
+
+        Args:
+            background (bool): If True, load on a daemon thread and return immediately.
+
+        Returns:
+            threading.Thread | None: The loading thread, or None if loaded synchronously.
+        """
+        def load_all():
+            for name in self._loaders:
+                try:
+                    self[name]
+                except Exception as e:
+                    # Leave it to the first request for this model to raise
+                    log(f"Warm-up of {name} failed: {e}", caller="Loader", verbose=True)
+            log("Models warmed up", caller="Loader", verbose=self.verbose)
+            STARTUP.log_report(verbose=self.verbose)
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="ModelWarmUp", daemon=True)
+        thread.start()
+        return thread
 
 def loader(models: dict, verbose: bool = True) -> None:
     """
     Load ML models into the provided dictionary if not already loaded.
 
     Supports:
-        - Scikit-learn classical models: LogisticRegression, RandomForest
-        - Keras/TensorFlow neural network: NeuralNetwork
+        - Scikit-learn classical models: LogisticRegression (NumPy export in
+          LogisticRegression.npz if it is up to date), RandomForest
+          (compiled array export in models/store/RandomForest if it is up to date)
+        - Neural network: NumPy export (NeuralNetwork.npz) if it is up to date,
+          otherwise the Keras/TensorFlow model (NeuralNetwork.h5)
 
     Args:
         models (dict): Dictionary to populate with loaded models.
@@ -20,16 +162,38 @@ def loader(models: dict, verbose: bool = True) -> None:
 
     log("Loading models...", caller="Loader", verbose=verbose)
 
-    # Get project root (one level above src)
-    PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent  
-    MODELS_DIR = PROJECT_ROOT / "models"
-
-    # ---- scikit-learn / classical ML models ----
-    models["logistic_regression"] = joblib.load(MODELS_DIR / "LogisticRegression.joblib")
-    models["random_forest"] = joblib.load(MODELS_DIR / "RandomForest.joblib")
-
-    # ---- neural network (Keras / TensorFlow) ----
-    models["neural_network"] = keras_load_model(MODELS_DIR / "NeuralNetwork.h5", compile=False)
+    lazy = LazyModels(verbose=verbose)
+    for name in lazy:
+        models[name] = lazy[name]
 
     log("Models loaded successfully", caller="Loader", verbose=verbose)
     log(f"Loaded models: {list(models.keys())}", caller="Loader", verbose=verbose)
+
+def load_neural_network(models_dir: Path, verbose: bool = True):
+    """
+    Load the neural network, preferring the TensorFlow-free NumPy export.
+
+    The `.npz` export is only used if it is at least as new as the `.h5` file,
+    so a freshly trained Keras model is never shadowed by stale weights.
+
+    Args:
+        models_dir (Path): Directory containing NeuralNetwork.h5 / NeuralNetwork.npz.
+        verbose (bool): If True, prints log messages.
+
+    Returns:
+        NumpyMLP or tf.keras.Model: Loaded neural network.
+    """
+    h5_path = models_dir / "NeuralNetwork.h5"
+    npz_path = models_dir / "NeuralNetwork.npz"
+
+    if npz_path.exists() and (not h5_path.exists() or npz_path.stat().st_mtime >= h5_path.stat().st_mtime):
+        log(f"Loading NumPy neural network from {npz_path}", caller="Loader", verbose=verbose)
+        return NumpyMLP.load(npz_path)
+
+    if npz_path.exists():
+        log(f"{npz_path.name} is older than {h5_path.name}, run 'python -m src.export_models -m MLP'",
+            caller="Loader", verbose=verbose)
+
+    # Import TensorFlow only when the Keras model is actually needed
+    from tensorflow.keras.models import load_model as keras_load_model
+    return keras_load_model(h5_path, compile=False)
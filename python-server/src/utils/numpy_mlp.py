@@ -0,0 +1,132 @@
+# python-server/src/utils/numpy_mlp.py
+import numpy as np
+from pathlib import Path
+from .model_store import replace_file
+
+class NumpyMLP:
+    """
+    Pure-NumPy forward pass for the Dense MLP built by ModelTrainer.
+
+    The network is a stack of Dense layers (Dense(128, relu) -> Dense(10, softmax)
+    for the NeuralNetwork model). Weights are stored as float32 in a compact `.npz`
+    file, so serving the model needs neither TensorFlow nor the HDF5 file.
+
+    Attributes:
+        model_name (str): Name used by Predictor for logging.
+        weights (list[np.ndarray]): Kernel per layer, shape (inputs, units).
+        biases (list[np.ndarray]): Bias per layer, shape (units,).
+        activations (list[str]): Activation per layer ('relu', 'softmax' or 'linear').
+    """
+
+    model_name = "neural_network"
+
+    ACTIVATIONS = ("relu", "softmax", "linear")
+
+    def __init__(self, weights: list, biases: list, activations: list):
+        """
+        Initialize the NumpyMLP.
+
+        Args:
+            weights (list[np.ndarray]): Kernel per layer, shape (inputs, units).
+            biases (list[np.ndarray]): Bias per layer, shape (units,).
+            activations (list[str]): Activation per layer.
+
+        Raises:
+            ValueError: If the layers do not line up or an activation is unsupported.
+        """
+        if not (len(weights) == len(biases) == len(activations)):
+            raise ValueError("weights, biases and activations must have the same length")
+        for activation in activations:
+            if activation not in self.ACTIVATIONS:
+                raise ValueError(f"Unsupported activation '{activation}'")
+
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+
+    @classmethod
+    def from_keras(cls, keras_model) -> "NumpyMLP":
+        """
+        Extract the Dense layer weights from a Keras Sequential model.
+
+        Args:
+            keras_model: Loaded Keras model made of Dense layers only.
+
+        Returns:
+            NumpyMLP: Model with the same weights and activations.
+
+        Raises:
+            ValueError: If the model contains layers other than Dense.
+        """
+        weights, biases, activations = [], [], []
+        for layer in keras_model.layers:
+            if type(layer).__name__ != "Dense":
+                raise ValueError(f"Unsupported layer type '{type(layer).__name__}'")
+            kernel, bias = layer.get_weights()
+            weights.append(kernel)
+            biases.append(bias)
+            activations.append(layer.get_config()["activation"])
+        return cls(weights, biases, activations)
+
+    @classmethod
+    def load(cls, path) -> "NumpyMLP":
+        """
+        Load a model saved with `save`.
+
+        Args:
+            path (str | Path): Path to the `.npz` file.
+
+        Returns:
+            NumpyMLP: Loaded model.
+        """
+        with np.load(Path(path)) as f:
+            n_layers = int(f["n_layers"])
+            weights = [f[f"W{i}"] for i in range(n_layers)]
+            biases = [f[f"b{i}"] for i in range(n_layers)]
+            activations = [str(a) for a in f["activations"]]
+        return cls(weights, biases, activations)
+
+    def save(self, path) -> Path:
+        """
+        Save the weights as float32 arrays in a `.npz` file.
+        The file is replaced, not rewritten, so running servers keep their copy.
+
+        Args:
+            path (str | Path): Destination file.
+
+        Returns:
+            Path: Path to the saved file.
+        """
+        path = Path(path)
+        arrays = {"n_layers": np.array(len(self.weights))}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"W{i}"] = w
+            arrays[f"b{i}"] = b
+        arrays["activations"] = np.array(self.activations)
+        return replace_file(path, lambda f: np.savez(f, **arrays))
+
+    def predict_proba(self, data: np.ndarray) -> np.ndarray:
+        """
+        Run the forward pass.
+
+        Args:
+            data (np.ndarray): Input data (shape: (N, 784)).
+
+        Returns:
+            np.ndarray: Class probabilities (shape: (N, 10)), float32.
+        """
+        x = np.asarray(data, dtype=np.float32)
+        for w, b, activation in zip(self.weights, self.biases, self.activations):
+            x = x @ w
+            x += b
+            if activation == "relu":
+                np.maximum(x, 0.0, out=x)
+            elif activation == "softmax":
+                x -= x.max(axis=1, keepdims=True)
+                np.exp(x, out=x)
+                x /= x.sum(axis=1, keepdims=True)
+        return x
+
+    def predict(self, data: np.ndarray) -> np.ndarray:
+        """Alias for `predict_proba`, matching the Keras `predict` output."""
+        return self.predict_proba(data)
@@ -1,7 +1,11 @@
+import sys
+import time
 import numpy as np
-import tensorflow as tf
 from pathlib import Path
 from .logger import log
+from .result_sink import get_result_sink
+from .metrics import get_metrics
+from .prediction_cache import PredictionCache
 from src.config import VERBOSE
 
 class Predictor:
@@ -10,75 +14,152 @@ class Predictor:
 
     Supports:
         - Scikit-learn models with `predict_proba`
+        - NumPy models (e.g. NumpyMLP, LinearSoftmax, CompiledForest) with `predict_proba` and a `model_name` attribute
         - Keras/TensorFlow models with `predict`
     """
 
-    def __init__(self, label: int, verbose: bool = None, log_dir: str = "./logs"):
+    def __init__(self, label: int, verbose: bool = None, log_dir: str = "./logs", sink=None):
         """
         Initialize the Predictor.
 
         Args:
+            label (int | None): True label of the input, results are only logged if given.
             verbose (bool, optional): Whether to print debug messages. Defaults to VERBOSE from config.
             log_dir (str): Directory where log files will be saved.
+            sink (ResultSink, optional): Writer for results. Defaults to the shared
+                background writer (RESULT_SINK_BACKEND), `log_dir` is used by the text files.
         """
         self.verbose = verbose if verbose is not None else VERBOSE
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.sink = sink if sink is not None else get_result_sink(log_dir)
         self.label = label
+        self.metrics = get_metrics()
 
-    def predict(self, model, input_data: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def is_keras_model(model) -> bool:
+        """
+        Check whether the model is a Keras model without importing TensorFlow.
+
+        A Keras model can only exist if TensorFlow has already been imported,
+        so serving NumPy/sklearn models never pays the TensorFlow import cost.
+
+        Args:
+            model: Trained ML model.
+
+        Returns:
+            bool: True if the model is a `tf.keras.Model`.
+        """
+        tf = sys.modules.get("tensorflow")
+        return tf is not None and isinstance(model, tf.keras.Model)
+
+    @staticmethod
+    def model_name(model) -> str:
+        """
+        Determine the name used for logging from the model type.
+
+        Args:
+            model: Trained ML model.
+
+        Returns:
+            str: 'neural_network', 'logistic_regression', 'random_forest' or 'other_model'.
+        """
+        if getattr(model, "model_name", None):
+            return model.model_name
+        if Predictor.is_keras_model(model):
+            return "neural_network"
+
+        model_class_name = type(model).__name__.lower()
+        if "logistic" in model_class_name:
+            return "logistic_regression"
+        elif "forest" in model_class_name:
+            return "random_forest"
+        return "other_model"
+
+    @staticmethod
+    def predict_batch(model, data: np.ndarray) -> np.ndarray:
+        """
+        Run one forward pass over a batch of preprocessed rows.
+
+        Args:
+            model: Trained ML model with a `predict` or `predict_proba` method.
+            data (np.ndarray): Preprocessed input data (shape: (N, 784)).
+
+        Returns:
+            np.ndarray: Predicted class probabilities (shape: (N, 10)).
+        """
+        if Predictor.is_keras_model(model):
+            return model.predict(data)
+        return model.predict_proba(data)
+
+    def predict(self, model, input_data: np.ndarray, scheduler=None, cache=None,
+                model_version: str = None) -> np.ndarray:
         """
         Make a prediction using the provided model and input data.
 
         Args:
             model: Trained ML model with a `predict` method.
             input_data (np.ndarray): Preprocessed input data (shape: (784,)).
+            scheduler (BatchScheduler, optional): If given, the row is batched together
+                with concurrent requests instead of being predicted on its own.
+            cache (PredictionCache, optional): If given, repeated inputs are answered
+                from the cache. Results are logged either way.
+            model_version (str, optional): Version of the model, stored with the result.
 
         Returns:
             np.ndarray: Predicted class probabilities.
         """
-        # Reshape input data to match required model input shape
-        data = input_data.reshape(1, -1)
-
-        # Make prediction and determine model type for logging
-        if isinstance(model, tf.keras.Model):
-            probabilities = model.predict(data)[0]
-            model_name = "neural_network"
-        else:
-            probabilities = model.predict_proba(data)[0]
-            # Determine log file based on model type
-            model_class_name = type(model).__name__.lower()
-            if "logistic" in model_class_name:
-                model_name = "logistic_regression"
-            elif "forest" in model_class_name:
-                model_name = "random_forest"
-            else:
-                model_name = "other_model"
+        # Determine model type for logging
+        model_name = self.model_name(model)
+
+        probabilities = cache.get(model_name, model, input_data) if cache is not None else None
+        if probabilities is None:
+            # Includes the time spent waiting for a batch to fill up
+            with self.metrics.time("inference", model=model_name):
+                if scheduler is not None:
+                    probabilities = scheduler.submit(model, input_data)
+                else:
+                    # Reshape input data to match required model input shape
+                    data = input_data.reshape(1, -1)
+                    probabilities = self.predict_batch(model, data)[0]
+
+            if cache is not None:
+                cache.put(model_name, model, input_data, probabilities)
 
         # Log to console
         log(f"Probabilities: {probabilities}", caller="Predictor", verbose=self.verbose)
 
         # Log results to file
-        self._log_result(model_name, probabilities)
+        with self.metrics.time("result_logging", model=model_name):
+            self._log_result(model_name, probabilities, input_data, model_version)
 
         return probabilities
 
-    def _log_result(self, model_name: str, probabilities: np.ndarray):
+    def _log_result(self, model_name: str, probabilities: np.ndarray, input_data: np.ndarray = None,
+                    model_version: str = None):
         """
-        Log the predicted class and probability to the appropriate file.
+        Queue the predicted class and probability of a labeled input.
+        The result is written by the background ResultSink, never on the request thread.
 
         Args:
-            model_name (str): Name of the model (used for filename).
+            model_name (str): Name of the model.
             probabilities (np.ndarray): Predicted class probabilities.
+            input_data (np.ndarray, optional): Preprocessed input, stored as a hash.
+            model_version (str, optional): Version of the model.
         """
-        log_file = self.log_dir / f"{model_name}_result.log"
         label = self.label
         predicted_class = int(np.argmax(probabilities))
         predicted_prob = float(np.max(probabilities))
 
-        with log_file.open("a") as f:
-            if label is not None:
-                f.write(f"{label}, {predicted_class}, {predicted_prob}\n")
+        if label is not None:
+            self.sink.write(model_name, {
+                "ts": time.time(),
+                "label": label,
+                "predicted": predicted_class,
+                "confidence": predicted_prob,
+                "model_version": model_version,
+                # Same digest as the prediction cache key, to find repeated inputs
+                "input_hash": PredictionCache.make_key(model_name, input_data)[1] if input_data is not None else None,
+            })
 
-        log(f"Logged to {log_file}: {label}, {predicted_class}, {predicted_prob}",
+        log(f"Logged to {self.sink.path_for(model_name)}: {label}, {predicted_class}, {predicted_prob}",
             caller="Predictor", verbose=self.verbose)
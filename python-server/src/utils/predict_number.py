@@ -1,59 +1,263 @@
+import contextvars
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from flask import jsonify
 from .data_processor import DataProcessor
 from .predict import Predictor
-from src.config import VERBOSE
+from src.config import VERBOSE, ENSEMBLE_WEIGHTS
 from .logger import log
 
-def predict_number_from_request(data: dict, MODELS: dict):
+# Shared thread pool for fanning one input out to all models
+_ensemble_pool = None
+_ensemble_lock = threading.Lock()
+
+def _get_ensemble_pool() -> ThreadPoolExecutor:
+    """Return the shared ensemble thread pool, created on first use."""
+    global _ensemble_pool
+    with _ensemble_lock:
+        if _ensemble_pool is None:
+            _ensemble_pool = ThreadPoolExecutor(thread_name_prefix="Ensemble")
+        return _ensemble_pool
+
+def _active_model(MODELS, name: str) -> tuple:
+    """
+    Return a model and its version as one consistent pair.
+
+    Args:
+        MODELS (dict | ModelRegistry): Models keyed by model name.
+        name (str): Model name.
+
+    Returns:
+        tuple: (model, version), version is None for models without versions.
+    """
+    active = getattr(MODELS, "active", None)
+    return active(name) if active is not None else (MODELS[name], None)
+
+def _describe_prediction(probabilities: np.ndarray) -> dict:
     """
-    Process a JSON request containing a base64-encoded image and predict the digit.
+    Build the prediction part of a response from class probabilities.
+
+    Args:
+        probabilities (np.ndarray): Predicted class probabilities.
+
+    Returns:
+        dict: predicted_digit, confidence and per-digit probabilities.
+    """
+    # Normalize probabilities to sum to 1
+    probabilities = probabilities / np.sum(probabilities)
+    return {
+        "predicted_digit": int(np.argmax(probabilities)),
+        "confidence": float(np.max(probabilities)),
+        "probabilities": [
+            {"digit": i, "prob": float(probabilities[i])}
+            for i in range(10)
+        ],
+    }
+
+def preprocess_payload(data: dict, dp: DataProcessor) -> np.ndarray:
+    """
+    Pick the cheapest decoder for the payload and return the normalized 784-vector.
+
+    Supported inputs, fastest first:
+        - frame: raw uint8 grayscale bytes (application/octet-stream body), read with np.frombuffer
+        - pixels: JSON array of uint8 grayscale values, flat or nested rows
+        - image: base64-encoded PNG (data URL), decoded with PIL
+
+    Frames and pixel arrays may be at canvas resolution or pre-reduced to 28x28,
+    optional `width` / `height` give the shape of flat input.
+
+    Args:
+        data (dict): Request payload.
+        dp (DataProcessor): Processor for this request.
+
+    Returns:
+        np.ndarray | None: Normalized float32 array (shape: (784,)), or None if no input was given.
+
+    Raises:
+        ValueError: If the input cannot be decoded.
+    """
+    if data.get("frame") is not None:
+        with dp.metrics.time("frame_decode"):
+            gray = dp.decode_raw_frame(data["frame"], data.get("width"), data.get("height"))
+        return dp.preprocess_array(gray)
+    if data.get("pixels") is not None:
+        with dp.metrics.time("pixels_decode"):
+            gray = dp.decode_pixel_array(data["pixels"], data.get("width"), data.get("height"))
+        return dp.preprocess_array(gray)
+    if data.get("image"):
+        image_pil = dp.decode_base64_image(data["image"])
+        return dp.preprocess_image(image_pil)
+    return None
+
+def predict_number_from_request(data: dict, MODELS: dict, schedulers: dict = None, cache=None):
+    """
+    Process a request containing a drawn digit and predict it.
+
+    Args:
+        data (dict): Request payload, parsed JSON or raw frame fields.
+        MODELS (dict | ModelRegistry): Models keyed by model name.
+        schedulers (dict, optional): BatchScheduler per model name. Models without
+            a scheduler are predicted one row at a time.
+        cache (PredictionCache, optional): Cache of recent predictions.
 
-    Expected payload:
+    Expected payload (one of frame, pixels or image, see preprocess_payload):
+        - frame: raw uint8 grayscale bytes
+        - pixels: JSON array of uint8 grayscale values
         - image: base64-encoded image string
-        - model: optional model key (defaults to "logistic_regression")
+        - width, height: optional shape of flat frame/pixels input
+        - model: optional model key (defaults to "logistic_regression"),
+          "ensemble" predicts with all models (see predict_ensemble)
+        - models: optional list of model names the "ensemble" combines
+        - weights: optional weight per model name for "ensemble"
 
     Returns:
         - JSON response with:
             - predicted_digit (int)
             - confidence (float)
             - probabilities (list of dicts with 'digit' and 'prob')
-            - model_used (str)
-        - HTTP status code (200 if successful, 400 if no image)
+            - model (str)
+            - model_version (str | None): active version of the model
+        - HTTP status code (200 if successful, 400 if no or invalid image or unknown model)
     """
-    image = data.get("image")
-
-    if not image:
-        return jsonify({"error": "No image provided."}), 400
     model_name = data.get("model", "logistic_regression")
-
+    if model_name != "ensemble" and model_name not in MODELS:
+        return jsonify({"error": f"Unknown model '{model_name}'."}), 400
     label = data.get("label")
 
     # Process the image
     dp = DataProcessor(verbose=VERBOSE)
-    image_pil = dp.decode_base64_image(image)
-    image_resized = dp.resize_and_center_image(image_pil)
-    image_normalized = dp.normalize_and_flatten_image(image_resized)
+    try:
+        image_normalized = preprocess_payload(data, dp)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid image: {e}"}), 400
 
-    # Predict
-    model_obj = MODELS[model_name]
+    if image_normalized is None:
+        return jsonify({"error": "No image provided."}), 400
+
+    if model_name == "ensemble":
+        return predict_ensemble(image_normalized, label, MODELS, schedulers, cache,
+                                weights=data.get("weights"), members=data.get("models"))
+
+    # Predict, batched with concurrent requests if a scheduler exists for this model
+    model_obj, model_version = _active_model(MODELS, model_name)
+    scheduler = schedulers.get(model_name) if schedulers else None
     prediction_probabilities = Predictor(label=label, verbose=VERBOSE).predict(
         model_obj,
-        image_normalized
+        image_normalized,
+        scheduler=scheduler,
+        cache=cache,
+        model_version=model_version
     )
 
-    # Normalize probabilities to sum to 1
-    prediction_probabilities = prediction_probabilities / np.sum(prediction_probabilities)
-
     # Build response
     response = {
         "label": label,
-        "predicted_digit": int(np.argmax(prediction_probabilities)),
-        "confidence": float(np.max(prediction_probabilities)),
-        "probabilities": [
-            {"digit": i, "prob": float(prediction_probabilities[i])}
-            for i in range(10)
-        ],
-        "model": model_name
+        **_describe_prediction(prediction_probabilities),
+        "model": model_name,
+        "model_version": model_version
+    }
+    return jsonify(response), 200
+
+def predict_ensemble(image_normalized: np.ndarray, label, MODELS: dict, schedulers: dict = None,
+                     cache=None, weights: dict = None, members: list = None):
+    """
+    Predict one preprocessed input with every loaded model in parallel.
+
+    The models run on a shared thread pool, so the latency is close to the
+    slowest model rather than the sum of all of them. The combined prediction
+    is the weighted average of the per-model probabilities. A model that fails
+    to load or predict is left out of the average and listed under `failed`,
+    the request only fails if no model with a positive weight predicted.
+
+    Args:
+        image_normalized (np.ndarray): Preprocessed input (shape: (784,)).
+        label (int | None): Optional true label, logged per model.
+        MODELS (dict | ModelRegistry): Models keyed by model name.
+        schedulers (dict, optional): BatchScheduler per model name.
+        cache (PredictionCache, optional): Cache of recent predictions.
+        weights (dict, optional): Weight per model name, missing models get
+            ENSEMBLE_WEIGHTS from config or 1.0.
+        members (list, optional): Names of the models to combine, defaults to all models.
+
+    Returns:
+        - JSON response with the combined prediction (as for a single model),
+          `models` with the prediction and version of every model that predicted,
+          `failed` with the error of every model that did not and the `weights` used
+        - HTTP status code (200 if successful, 400 if the models or weights are
+          invalid, 503 if no model predicted)
+    """
+    if members is None:
+        members = list(MODELS)
+    elif not isinstance(members, list) or not members or not all(isinstance(name, str) for name in members):
+        return jsonify({"error": "Models must be a non-empty list of model names."}), 400
+    if weights is not None and not isinstance(weights, dict):
+        return jsonify({"error": "Weights must be an object of numbers."}), 400
+    unknown = [name for name in [*members, *(weights or {})] if name not in MODELS]
+    if unknown:
+        return jsonify({"error": f"Unknown model '{unknown[0]}'."}), 400
+
+    try:
+        model_weights = {
+            name: float((weights or {}).get(name, ENSEMBLE_WEIGHTS.get(name, 1.0)))
+            for name in dict.fromkeys(members)
+        }
+    except (TypeError, ValueError):
+        return jsonify({"error": "Weights must be an object of numbers."}), 400
+    if not all(math.isfinite(w) for w in model_weights.values()):
+        return jsonify({"error": "Weights must be finite numbers."}), 400
+    if any(w < 0 for w in model_weights.values()) or sum(model_weights.values()) <= 0:
+        return jsonify({"error": "Weights must be non-negative and not all zero."}), 400
+
+    predictor = Predictor(label=label, verbose=VERBOSE)
+    pool = _get_ensemble_pool()
+    active, futures, failed = {}, {}, {}
+    for name in model_weights:
+        try:
+            model_obj, version = active[name] = _active_model(MODELS, name)
+        except Exception as e:
+            failed[name] = f"Failed to load: {e}"
+            continue
+        # Each task runs in a copy of this request's context, so its timings keep the route label
+        futures[name] = pool.submit(
+            contextvars.copy_context().run,
+            predictor.predict,
+            model_obj,
+            image_normalized,
+            scheduler=schedulers.get(name) if schedulers else None,
+            cache=cache,
+            model_version=version
+        )
+
+    probabilities = {}
+    for name, future in futures.items():
+        try:
+            probabilities[name] = future.result()
+        except Exception as e:
+            failed[name] = f"Failed to predict: {e}"
+    for name, error in failed.items():
+        log(f"Ensemble left out {name}: {error}", caller="Ensemble", verbose=True)
+    log(f"Ensemble predicted with {list(probabilities)}", caller="Ensemble", verbose=VERBOSE)
+
+    total_weight = sum(model_weights[name] for name in probabilities)
+    if total_weight <= 0:
+        return jsonify({"error": "No model of the ensemble could predict.", "failed": failed}), 503
+
+    # Weighted average of the normalized per-model probabilities
+    combined = sum(
+        model_weights[name] * (p / np.sum(p)) for name, p in probabilities.items()
+    ) / total_weight
+
+    response = {
+        "label": label,
+        **_describe_prediction(combined),
+        "model": "ensemble",
+        "models": {
+            name: {**_describe_prediction(p), "model_version": active[name][1]}
+            for name, p in probabilities.items()
+        },
+        "failed": failed,
+        "weights": model_weights
     }
     return jsonify(response), 200
@@ -0,0 +1,164 @@
+# python-server/src/utils/prediction_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from .logger import log
+from src.config import VERBOSE
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predicted probabilities.
+
+    Entries are keyed by the model name and a hash of the input vector quantized
+    to 8 bits (the preprocessed vector holds k/255 values, so this is lossless).
+    Entries expire after `ttl_seconds`, the least recently used entry is evicted
+    when the cache is full, and all entries of a model name are dropped as soon
+    as a different model object is seen under that name.
+
+    Attributes:
+        max_size (int): Maximum number of cached predictions.
+        ttl_seconds (float): Time to live of an entry in seconds.
+        verbose (bool): If True, prints debug messages.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300.0, verbose: bool = None):
+        """
+        Initialize the PredictionCache.
+
+        Args:
+            max_size (int): Maximum number of cached predictions.
+            ttl_seconds (float): Time to live of an entry in seconds.
+            verbose (bool, optional): Whether to print debug messages. Defaults to VERBOSE from config.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.verbose = verbose if verbose is not None else VERBOSE
+
+        self._entries = OrderedDict()
+        self._models = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(model_name: str, input_data: np.ndarray) -> tuple:
+        """
+        Build the cache key for a model name and preprocessed input.
+
+        Args:
+            model_name (str): Name of the model.
+            input_data (np.ndarray): Preprocessed input in [0, 1] (shape: (784,)).
+
+        Returns:
+            tuple: (model_name, 16-byte digest of the quantized input).
+        """
+        quantized = np.rint(np.asarray(input_data, dtype=np.float32) * 255.0).astype(np.uint8)
+        return model_name, hashlib.blake2b(quantized.tobytes(), digest_size=16).digest()
+
+    def get(self, model_name: str, model, input_data: np.ndarray) -> np.ndarray | None:
+        """
+        Look up cached probabilities.
+
+        Args:
+            model_name (str): Name of the model.
+            model: Model object currently serving `model_name`.
+            input_data (np.ndarray): Preprocessed input (shape: (784,)).
+
+        Returns:
+            np.ndarray | None: Read-only cached probabilities, or None on a miss.
+        """
+        key = self.make_key(model_name, input_data)
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_model(model_name, model)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        log(f"Cache hit for {model_name}", caller="PredictionCache", verbose=self.verbose)
+        return entry[1]
+
+    def put(self, model_name: str, model, input_data: np.ndarray, probabilities: np.ndarray) -> None:
+        """
+        Store predicted probabilities.
+
+        Args:
+            model_name (str): Name of the model.
+            model: Model object that produced the probabilities.
+            input_data (np.ndarray): Preprocessed input (shape: (784,)).
+            probabilities (np.ndarray): Predicted class probabilities.
+        """
+        key = self.make_key(model_name, input_data)
+        value = np.array(probabilities, copy=True)
+        value.setflags(write=False)
+
+        with self._lock:
+            self._check_model(model_name, model)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, model_name: str = None) -> None:
+        """
+        Drop cached entries.
+
+        Args:
+            model_name (str, optional): Only drop entries of this model. Defaults to all.
+        """
+        with self._lock:
+            self._invalidate(model_name)
+
+    def stats(self) -> dict:
+        """
+        Return cache counters.
+
+        Returns:
+            dict: Size, hits, misses, hit rate, evictions and invalidations.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _check_model(self, model_name: str, model) -> None:
+        """Invalidate a model name's entries if it is now served by a different object (lock held)."""
+        current = self._models.get(model_name)
+        if current is model:
+            return
+        if current is not None:
+            log(f"Model behind '{model_name}' changed, invalidating cache", caller="PredictionCache",
+                verbose=self.verbose)
+            self._invalidate(model_name)
+        self._models[model_name] = model
+
+    def _invalidate(self, model_name: str = None) -> None:
+        """Drop entries of one or all models (lock held)."""
+        if model_name is None:
+            self._entries.clear()
+        else:
+            for key in [key for key in self._entries if key[0] == model_name]:
+                del self._entries[key]
+        self.invalidations += 1
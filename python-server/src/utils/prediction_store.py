@@ -0,0 +1,231 @@
+# python-server/src/utils/prediction_store.py
+import atexit
+import os
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from .logger import log
+from .db_pool import get_pool
+from .result_sink import ResultSink
+from src.config import (
+    RESULT_SINK_FLUSH_LINES,
+    RESULT_SINK_FLUSH_INTERVAL,
+    PREDICTION_STORE_PATH,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    model TEXT NOT NULL,
+    model_version TEXT,
+    label INTEGER,
+    predicted INTEGER NOT NULL,
+    confidence REAL NOT NULL,
+    input_hash BLOB
+);
+CREATE INDEX IF NOT EXISTS predictions_model_ts ON predictions (model, ts);
+
+CREATE TABLE IF NOT EXISTS confusion (
+    model TEXT NOT NULL,
+    label INTEGER NOT NULL,
+    predicted INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (model, label, predicted)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS model_totals (
+    model TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    predictions INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    last_ts REAL NOT NULL,
+    PRIMARY KEY (model, model_version)
+) WITHOUT ROWID;
+"""
+
+class PredictionStore(ResultSink):
+    """
+    ResultSink that appends prediction results to a SQLite database.
+
+    Every result becomes a row of `predictions` with its timestamp, model
+    version and input hash. In the same transaction the writer thread adds the
+    batch to the running counters in `confusion` (per model, label and
+    predicted digit) and `model_totals` (per model version), so `aggregates`
+    reads at most a hundred counter rows per model instead of the history.
+
+    The database runs in WAL mode: readers never block the writer, and the
+    writer threads of several worker processes take turns on the write lock
+    (waiting up to `busy_timeout` seconds).
+
+    Attributes:
+        db_path (Path): Path to the SQLite database.
+        busy_timeout (float): Seconds to wait for another process' write.
+    """
+
+    def __init__(self, db_path: str = "./data/db/predictions.db", flush_lines: int = 64,
+                 flush_interval: float = 1.0, queue_size: int = 10000, busy_timeout: float = 5.0,
+                 verbose: bool = None):
+        """
+        Initialize the PredictionStore. The database is opened by the writer thread on first write.
+
+        Args:
+            db_path (str): Path to the SQLite database, created if missing.
+            flush_lines (int): Number of pending results that triggers a write.
+            flush_interval (float): Maximum seconds a result waits before it is written.
+            queue_size (int): Maximum number of queued results, more are dropped.
+            busy_timeout (float): Seconds to wait for another process' write.
+            verbose (bool, optional): Whether to print debug messages. Defaults to VERBOSE from config.
+        """
+        self.db_path = Path(db_path)
+        super().__init__(self.db_path.parent, flush_lines=flush_lines, flush_interval=flush_interval,
+                         max_bytes=0, queue_size=queue_size, verbose=verbose)
+        self.busy_timeout = busy_timeout
+        # Connection of the writer thread and the process it was opened in
+        self._conn = None
+        self._conn_pid = None
+
+    def path_for(self, model_name: str) -> Path:
+        """Return the database path, results of all models go to the same file."""
+        return self.db_path
+
+    def aggregates(self) -> dict:
+        """
+        Return the running accuracy and confusion matrix of every model.
+
+        Only the counter tables are read, so the cost does not grow with the
+        number of stored predictions. Results still queued are not included.
+
+        Returns:
+            dict: Model name -> predictions, correct, accuracy, 10x10 confusion
+                  matrix (rows are labels) and the same counts per version.
+        """
+        if not self.db_path.exists():
+            return {}
+        try:
+            with get_pool(self.db_path, readonly=True).connection() as conn:
+                totals = conn.execute(
+                    "SELECT model, model_version, predictions, correct, last_ts FROM model_totals").fetchall()
+                cells = conn.execute("SELECT model, label, predicted, count FROM confusion").fetchall()
+        except sqlite3.OperationalError:
+            return {}  # Created but nothing stored yet
+
+        result = {}
+        for model, version, predictions, correct, last_ts in totals:
+            entry = result.setdefault(model, {
+                "predictions": 0, "correct": 0, "last_ts": 0.0,
+                "confusion_matrix": [[0] * 10 for _ in range(10)], "versions": {},
+            })
+            entry["predictions"] += predictions
+            entry["correct"] += correct
+            entry["last_ts"] = max(entry["last_ts"], last_ts)
+            entry["versions"][version] = {
+                "predictions": predictions,
+                "correct": correct,
+                "accuracy": correct / predictions if predictions else None,
+            }
+        for model, label, predicted, count in cells:
+            if model in result and 0 <= label < 10 and 0 <= predicted < 10:
+                result[model]["confusion_matrix"][label][predicted] = count
+        for entry in result.values():
+            entry["accuracy"] = entry["correct"] / entry["predictions"] if entry["predictions"] else None
+        return result
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the schema in place."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Skips the fsync per commit, a power failure may lose the last results but never corrupts the file
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        """Return the writer thread's connection, reopened in a forked process."""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = self._connect()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _flush(self, pending: dict) -> None:
+        """Insert the pending results and update the counters in one transaction."""
+        rows = []
+        confusion = Counter()
+        totals = {}
+        for model_name, records in pending.items():
+            for record in records:
+                label = _as_digit(record["label"])
+                version = record.get("model_version") or ""
+                rows.append((record["ts"], model_name, version, label, record["predicted"],
+                             record["confidence"], record.get("input_hash")))
+                if label is None:
+                    continue
+                confusion[model_name, label, record["predicted"]] += 1
+                total = totals.setdefault((model_name, version), [0, 0, 0.0])
+                total[0] += 1
+                total[1] += label == record["predicted"]
+                total[2] = max(total[2], record["ts"])
+
+        try:
+            conn = self._writer_connection()
+            # Take the write lock up front, so waiting for another process is covered by busy_timeout
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO predictions (ts, model, model_version, label, predicted, confidence, input_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.executemany(
+                    "INSERT INTO confusion (model, label, predicted, count) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (model, label, predicted) DO UPDATE SET count = count + excluded.count",
+                    [(*key, count) for key, count in confusion.items()])
+                conn.executemany(
+                    "INSERT INTO model_totals (model, model_version, predictions, correct, last_ts) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (model, model_version) DO UPDATE SET "
+                    "predictions = predictions + excluded.predictions, correct = correct + excluded.correct, "
+                    "last_ts = max(last_ts, excluded.last_ts)",
+                    [(*key, *total) for key, total in totals.items()])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            with self._lock:
+                self.failed += len(rows)
+            log(f"Failed to store {len(rows)} results in {self.db_path}: {e!r}", caller="PredictionStore", verbose=True)
+            return
+
+        with self._lock:
+            self.written += len(rows)
+        log(f"Stored {len(rows)} results in {self.db_path}", caller="PredictionStore", verbose=self.verbose)
+
+def _as_digit(label) -> int | None:
+    """Return the label as an int, or None if it is missing or not a number."""
+    try:
+        return int(label)
+    except (TypeError, ValueError):
+        return None
+
+_default_store = None
+_default_lock = threading.Lock()
+
+def get_prediction_store() -> PredictionStore:
+    """
+    Return the process-wide PredictionStore configured from src/config.py.
+    Pending results are written when the interpreter exits.
+
+    Returns:
+        PredictionStore: Shared instance.
+    """
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = PredictionStore(
+                    PREDICTION_STORE_PATH,
+                    flush_lines=RESULT_SINK_FLUSH_LINES,
+                    flush_interval=RESULT_SINK_FLUSH_INTERVAL
+                )
+                atexit.register(_default_store.flush)
+    return _default_store
@@ -0,0 +1,289 @@
+# python-server/src/utils/result_sink.py
+import atexit
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from queue import Queue, Empty, Full
+from .logger import log
+from src.config import (
+    VERBOSE,
+    RESULT_SINK_FLUSH_LINES,
+    RESULT_SINK_FLUSH_INTERVAL,
+    RESULT_SINK_MAX_BYTES,
+    RESULT_SINK_BACKUP_COUNT,
+    RESULT_SINK_PER_PROCESS,
+    RESULT_SINK_BACKEND,
+)
+
+class ResultSink:
+    """
+    Queue-backed writer for prediction results.
+
+    `write` only puts the result on a queue, a background thread batches the
+    results per model and appends each batch with a single write, flushing when
+    `flush_lines` results are pending or `flush_interval` seconds have passed.
+    Each result is written as a `label, predicted, confidence` line, files are
+    rotated when they would grow beyond `max_bytes`. Subclasses write the
+    batches elsewhere by overriding `_flush` (see PredictionStore). A batch
+    that cannot be written is logged and counted as failed, the writer thread
+    carries on with the next one.
+
+    With `per_process` each worker process appends to its own
+    `<model>_result.<pid>.log`, which `merge_result_logs` folds back into
+    `<model>_result.log` when the workers are stopped. Without it, all processes
+    append whole batches to the shared file with O_APPEND.
+
+    Attributes:
+        log_dir (Path): Directory where result files are written.
+        flush_lines (int): Number of pending lines that triggers a flush.
+        flush_interval (float): Maximum seconds a line waits before it is written.
+        max_bytes (int): Rotate a file when it would grow beyond this size (0 disables rotation).
+        backup_count (int): Number of rotated files kept (`.1` is the newest).
+        per_process (bool): Write one file per worker process.
+        verbose (bool): If True, prints debug messages.
+    """
+
+    def __init__(self, log_dir: str = "./logs", flush_lines: int = 64, flush_interval: float = 1.0,
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, per_process: bool = False,
+                 queue_size: int = 10000, verbose: bool = None):
+        """
+        Initialize the ResultSink. The writer thread is started on first write.
+
+        Args:
+            log_dir (str): Directory where result files are written.
+            flush_lines (int): Number of pending lines that triggers a flush.
+            flush_interval (float): Maximum seconds a line waits before it is written.
+            max_bytes (int): Rotate a file when it would grow beyond this size (0 disables rotation).
+            backup_count (int): Number of rotated files kept.
+            per_process (bool): Write one file per worker process.
+            queue_size (int): Maximum number of queued lines, more are dropped.
+            verbose (bool, optional): Whether to print debug messages. Defaults to VERBOSE from config.
+        """
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.per_process = per_process
+        self.verbose = verbose if verbose is not None else VERBOSE
+
+        self._queue = Queue(maxsize=queue_size)
+        self._writer = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.rotations = 0
+
+    def write(self, model_name: str, record: dict) -> bool:
+        """
+        Queue one result without waiting on disk I/O.
+
+        Args:
+            model_name (str): Name of the model (used for the filename).
+            record (dict): Result with keys ts, label, predicted, confidence,
+                model_version and input_hash (see Predictor._log_result).
+
+        Returns:
+            bool: True if queued, False if dropped because the queue is full.
+        """
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((model_name, record))
+        except Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Block until every queued result has been written."""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.join()
+
+    def stats(self) -> dict:
+        """
+        Return writer counters.
+
+        Returns:
+            dict: Pending, written, dropped and failed results and number of rotations.
+        """
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "rotations": self.rotations,
+            }
+
+    @staticmethod
+    def format_line(record: dict) -> str:
+        """Format a result as a `label, predicted, confidence` line."""
+        return f"{record['label']}, {record['predicted']}, {record['confidence']}"
+
+    def path_for(self, model_name: str) -> Path:
+        """
+        Return the result file of a model for the current process.
+
+        Args:
+            model_name (str): Name of the model.
+
+        Returns:
+            Path: `<model>_result.log`, or `<model>_result.<pid>.log` with per_process.
+        """
+        if self.per_process:
+            return self.log_dir / f"{model_name}_result.{os.getpid()}.log"
+        return self.log_dir / f"{model_name}_result.log"
+
+    def _ensure_writer(self):
+        """Start the writer thread if it is not running (e.g. after a fork)."""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="ResultSink", daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        """Writer loop: batch results per model and flush by size or time."""
+        pending = {}
+        n_pending = 0
+        oldest = 0.0
+
+        while True:
+            # Wait for a result, but never longer than the oldest pending one may wait
+            timeout = max(0.0, oldest + self.flush_interval - time.monotonic()) if n_pending else None
+            try:
+                model_name, record = self._queue.get(timeout=timeout)
+                if not n_pending:
+                    oldest = time.monotonic()
+                pending.setdefault(model_name, []).append(record)
+                n_pending += 1
+            except Empty:
+                pass
+
+            if n_pending >= self.flush_lines or (n_pending and time.monotonic() - oldest >= self.flush_interval):
+                try:
+                    self._flush(pending)
+                except Exception as e:
+                    # Whatever went wrong with this batch, the thread has to live on for the next one
+                    with self._lock:
+                        self.failed += n_pending
+                    log(f"Failed to write {n_pending} results: {e!r}", caller="ResultSink", verbose=True)
+                finally:
+                    for _ in range(n_pending):
+                        self._queue.task_done()
+                pending = {}
+                n_pending = 0
+
+    def _flush(self, pending: dict) -> None:
+        """Append each model's pending results with one write."""
+        for model_name, records in pending.items():
+            path = self.path_for(model_name)
+            try:
+                lines = [self.format_line(record) for record in records]
+                data = ("\n".join(lines) + "\n").encode()
+                self._rotate_if_needed(path, len(data))
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, data)
+                finally:
+                    os.close(fd)
+            except Exception as e:
+                with self._lock:
+                    self.failed += len(records)
+                log(f"Failed to write {len(records)} lines to {path}: {e!r}", caller="ResultSink", verbose=True)
+                continue
+
+            with self._lock:
+                self.written += len(lines)
+            log(f"Wrote {len(lines)} lines to {path}", caller="ResultSink", verbose=self.verbose)
+
+    def _rotate_if_needed(self, path: Path, incoming: int) -> None:
+        """Rename `path` to `path.1` (shifting older backups) if it would exceed max_bytes."""
+        if not self.max_bytes or not path.exists() or path.stat().st_size + incoming <= self.max_bytes:
+            return
+
+        for i in range(self.backup_count - 1, 0, -1):
+            older = path.with_name(f"{path.name}.{i}")
+            if older.exists():
+                os.replace(older, path.with_name(f"{path.name}.{i + 1}"))
+        if self.backup_count > 0:
+            os.replace(path, path.with_name(f"{path.name}.1"))
+        else:
+            path.unlink()
+
+        with self._lock:
+            self.rotations += 1
+        log(f"Rotated {path}", caller="ResultSink", verbose=self.verbose)
+
+def merge_result_logs(log_dir: str = "./logs") -> list[Path]:
+    """
+    Append per-process result files to the shared `<model>_result.log` files.
+
+    Run this when the workers are stopped (or have been replaced), otherwise
+    lines written after the merge end up in a new per-process file.
+
+    Args:
+        log_dir (str): Directory containing the result files.
+
+    Returns:
+        list[Path]: Shared result files that received lines.
+    """
+    log_dir = Path(log_dir)
+    pattern = re.compile(r"^(?P<model>.+)_result\.(?P<pid>\d+)\.log$")
+    merged = set()
+
+    for path in sorted(log_dir.glob("*_result.*.log"), key=lambda p: p.stat().st_mtime):
+        match = pattern.match(path.name)
+        if not match:
+            continue
+        target = log_dir / f"{match['model']}_result.log"
+        with path.open("rb") as src, target.open("ab") as dst:
+            dst.write(src.read())
+        path.unlink()
+        merged.add(target)
+        log(f"Merged {path.name} into {target.name}", caller="ResultSink", verbose=VERBOSE)
+
+    return sorted(merged)
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+def get_result_sink(log_dir: str = "./logs", backend: str = RESULT_SINK_BACKEND) -> ResultSink:
+    """
+    Return the process-wide result writer, configured from src/config.py.
+    Pending results are written when the interpreter exits.
+
+    Args:
+        log_dir (str): Directory where result files are written ("text" backend).
+        backend (str): "sqlite" for the shared PredictionStore, "text" for result files.
+
+    Returns:
+        ResultSink: Shared instance.
+    """
+    if backend == "sqlite":
+        from .prediction_store import get_prediction_store
+        return get_prediction_store()
+
+    key = os.path.abspath(log_dir)
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None:
+            sink = ResultSink(
+                log_dir,
+                flush_lines=RESULT_SINK_FLUSH_LINES,
+                flush_interval=RESULT_SINK_FLUSH_INTERVAL,
+                max_bytes=RESULT_SINK_MAX_BYTES,
+                backup_count=RESULT_SINK_BACKUP_COUNT,
+                per_process=RESULT_SINK_PER_PROCESS
+            )
+            atexit.register(sink.flush)
+            _sinks[key] = sink
+    return sink
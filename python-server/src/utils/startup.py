@@ -0,0 +1,84 @@
+# python-server/src/utils/startup.py
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from .logger import log
+
+class StartupTimer:
+    """
+    Record how long each import and model load takes during startup.
+
+    Attributes:
+        started (float): perf_counter value when the timer was created.
+        imports (dict): Seconds per imported module.
+        loads (dict): Seconds per loaded model.
+    """
+
+    def __init__(self):
+        """Initialize the StartupTimer, startup is measured from here."""
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.loads = {}
+        self._lock = threading.Lock()
+
+    def import_modules(self, *names: str) -> None:
+        """
+        Import modules in order and record the time of each one.
+        Modules that are already imported are skipped.
+
+        Args:
+            *names (str): Module names, e.g. "numpy", "flask".
+        """
+        for name in names:
+            if name in sys.modules:
+                continue
+            with self.measure("import", name):
+                importlib.import_module(name)
+
+    @contextmanager
+    def measure(self, kind: str, name: str):
+        """
+        Time the body of a with-block, nothing is recorded if it raises.
+
+        Args:
+            kind (str): 'import' or 'load'.
+            name (str): Module or model name.
+        """
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            (self.imports if kind == "import" else self.loads)[name] = elapsed
+
+    def report(self) -> dict:
+        """
+        Return the startup breakdown.
+
+        Returns:
+            dict: Seconds per import and per model load, and the time since the
+                  timer was created.
+        """
+        with self._lock:
+            return {
+                "imports": dict(self.imports),
+                "loads": dict(self.loads),
+                "elapsed": time.perf_counter() - self.started,
+            }
+
+    def log_report(self, verbose: bool = True) -> None:
+        """
+        Print the startup breakdown, slowest first.
+
+        Args:
+            verbose (bool): If False, suppresses output.
+        """
+        report = self.report()
+        for kind in ("imports", "loads"):
+            for name, seconds in sorted(report[kind].items(), key=lambda item: -item[1]):
+                log(f"{kind[:-1]:<6} {name:<30} {seconds * 1000:8.1f} ms", caller="Startup", verbose=verbose)
+        log(f"Total since start: {report['elapsed'] * 1000:.1f} ms", caller="Startup", verbose=verbose)
+
+# Process-wide timer, created when the server starts importing
+STARTUP = StartupTimer()
@@ -0,0 +1,38 @@
+# python-server/tests/conftest.py
+import numpy as np
+import pytest
+
+@pytest.fixture(scope="session")
+def digits():
+    """
+    Small digit dataset bundled with scikit-learn (8x8 images, 10 classes), scaled to [0, 1].
+
+    Returns:
+        tuple: Train images, train labels and test images, float32.
+    """
+    from sklearn.datasets import load_digits
+
+    data, labels = load_digits(return_X_y=True)
+    data = (data / 16.0).astype(np.float32)
+    return data[:1200], labels[:1200], data[1200:]
+
+@pytest.fixture(scope="session")
+def products_db(tmp_path_factory):
+    """
+    Migrated copy of the shipped products database, used in place of data/db for the whole session.
+
+    Returns:
+        Path: Directory holding products.db.
+    """
+    import shutil
+    from pathlib import Path
+    from src.migrate_db import migrate
+    from src.utils import db_utils
+
+    db_dir = tmp_path_factory.mktemp("db")
+    shutil.copy(Path(__file__).resolve().parent.parent / "data" / "db" / "products.db", db_dir / "products.db")
+    migrate(db_dir, verbose=False)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(db_utils, "DB_PATH", db_dir)
+        mp.setattr(db_utils, "_search_checked", False)
+        yield db_dir
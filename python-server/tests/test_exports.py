@@ -0,0 +1,105 @@
+# python-server/tests/test_exports.py
+import numpy as np
+import pytest
+
+from src.utils.numpy_mlp import NumpyMLP
+from src.utils.linear_model import LinearSoftmax
+from src.utils.compiled_forest import CompiledForest
+
+def test_linear_softmax_matches_sklearn(digits, tmp_path):
+    from sklearn.linear_model import LogisticRegression
+
+    train, labels, test = digits
+    model = LogisticRegression(max_iter=500).fit(train, labels)
+    linear = LinearSoftmax.load(LinearSoftmax.from_sklearn(model).save(tmp_path / "LogisticRegression.npz"))
+
+    expected = model.predict_proba(test)
+    actual = linear.predict_proba(test)
+    assert actual.dtype == np.float32
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+    np.testing.assert_array_equal(linear.predict(test), model.predict(test))
+
+def test_linear_softmax_needs_three_classes():
+    with pytest.raises(ValueError):
+        LinearSoftmax(np.zeros((1, 4)), np.zeros(1), np.array([0, 1]))
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_numpy_mlp_matches_sklearn_mlp(digits, tmp_path):
+    from sklearn.neural_network import MLPClassifier
+
+    # Same architecture as the served network: Dense(relu) -> Dense(softmax)
+    train, labels, test = digits
+    model = MLPClassifier(hidden_layer_sizes=(32,), activation="relu", max_iter=300, random_state=0)
+    model.fit(train, labels)
+    mlp = NumpyMLP(model.coefs_, model.intercepts_, ["relu", "softmax"])
+    mlp = NumpyMLP.load(mlp.save(tmp_path / "NeuralNetwork.npz"))
+
+    expected = model.predict_proba(test)
+    actual = mlp.predict(test)
+    assert actual.dtype == np.float32
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+    np.testing.assert_array_equal(actual.argmax(axis=1), model.predict(test))
+
+def test_numpy_mlp_matches_keras(digits, tmp_path):
+    tf = pytest.importorskip("tensorflow")
+
+    train, labels, test = digits
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(train.shape[1],)),
+        tf.keras.layers.Dense(32, activation="relu"),
+        tf.keras.layers.Dense(10, activation="softmax"),
+    ])
+    model.compile(optimizer="adam", loss="sparse_categorical_crossentropy")
+    model.fit(train, labels, epochs=2, verbose=0)
+    mlp = NumpyMLP.load(NumpyMLP.from_keras(model).save(tmp_path / "NeuralNetwork.npz"))
+
+    expected = model.predict(test, verbose=0)
+    actual = mlp.predict(test)
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+    np.testing.assert_array_equal(actual.argmax(axis=1), expected.argmax(axis=1))
+
+def test_numpy_mlp_rejects_unknown_activation():
+    with pytest.raises(ValueError):
+        NumpyMLP([np.zeros((4, 2))], [np.zeros(2)], ["tanh"])
+
+def test_compiled_forest_matches_sklearn(digits, tmp_path):
+    from sklearn.ensemble import RandomForestClassifier
+
+    train, labels, test = digits
+    # n_jobs=1 adds the trees in order, the order the compiled forest uses
+    forest = RandomForestClassifier(n_estimators=20, random_state=0, n_jobs=1).fit(train, labels)
+    CompiledForest.from_sklearn(forest).save("RandomForest", tmp_path)
+    compiled = CompiledForest.load("RandomForest", tmp_path)
+
+    np.testing.assert_array_equal(compiled.predict_proba(test), forest.predict_proba(test))
+    np.testing.assert_array_equal(compiled.predict_proba(test[:1]), forest.predict_proba(test[:1]))
+    np.testing.assert_array_equal(compiled.predict(test), forest.predict(test))
+
+def test_new_export_leaves_memory_mapped_forest_intact(digits, tmp_path):
+    from sklearn.ensemble import RandomForestClassifier
+
+    train, labels, test = digits
+    first = RandomForestClassifier(n_estimators=5, random_state=0, n_jobs=1).fit(train, labels)
+    second = RandomForestClassifier(n_estimators=8, random_state=1, n_jobs=1).fit(train, labels)
+    CompiledForest.from_sklearn(first).save("RandomForest", tmp_path)
+    mapped = CompiledForest.load("RandomForest", tmp_path, mmap_mode="r")
+
+    CompiledForest.from_sklearn(second).save("RandomForest", tmp_path)
+    np.testing.assert_array_equal(mapped.predict_proba(test), first.predict_proba(test))
+    np.testing.assert_array_equal(CompiledForest.load("RandomForest", tmp_path).predict_proba(test),
+                                  second.predict_proba(test))
+    assert not list(tmp_path.rglob("*.tmp"))
+
+def test_npz_exports_are_replaced(digits, tmp_path):
+    from sklearn.linear_model import LogisticRegression
+
+    train, labels, _ = digits
+    path = tmp_path / "LogisticRegression.npz"
+    linear = LinearSoftmax.from_sklearn(LogisticRegression(max_iter=500).fit(train, labels))
+    inode = linear.save(path).stat().st_ino
+    assert linear.save(path).stat().st_ino != inode
+    mlp = NumpyMLP([np.ones((4, 2))], [np.zeros(2)], ["softmax"])
+    inode = mlp.save(tmp_path / "NeuralNetwork.npz").stat().st_ino
+    assert mlp.save(tmp_path / "NeuralNetwork.npz").stat().st_ino != inode
+    assert not list(tmp_path.glob("*.tmp"))
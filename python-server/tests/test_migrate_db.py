@@ -0,0 +1,55 @@
+# python-server/tests/test_migrate_db.py
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.migrate_db import migrate
+
+SHIPPED_DB = Path(__file__).resolve().parent.parent / "data" / "db" / "products.db"
+
+@pytest.fixture
+def db_dir(tmp_path):
+    shutil.copy(SHIPPED_DB, tmp_path / "products.db")
+    return tmp_path
+
+def test_migrate_switches_to_wal(db_dir):
+    assert migrate(db_dir, verbose=False) == [db_dir / "products.db"]
+    with sqlite3.connect(db_dir / "products.db") as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_migrate_runs_again(db_dir):
+    migrate(db_dir, verbose=False)
+    assert migrate(db_dir, verbose=False) == [db_dir / "products.db"]
+
+def test_migrate_builds_the_search_index(db_dir):
+    migrate(db_dir, verbose=False)
+    with sqlite3.connect(db_dir / "products.db") as conn:
+        rows = conn.execute("SELECT rowid FROM products_fts WHERE products_fts MATCH '\"skål\"' ORDER BY rowid")
+        assert [row[0] for row in rows] == [2, 3, 4, 12]
+
+def test_search_needs_the_migration(db_dir, monkeypatch):
+    from src.utils import db_utils
+
+    monkeypatch.setattr(db_utils, "DB_PATH", db_dir)
+    monkeypatch.setattr(db_utils, "_search_checked", False)
+    with pytest.raises(RuntimeError, match="migrate_db"):
+        db_utils.search_products("skål")
+    with sqlite3.connect(db_dir / "products.db") as conn:
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'products_fts'").fetchone() is None
+
+def test_catalog_needs_the_migration(db_dir, monkeypatch):
+    from src.utils import db_utils
+    from src.utils.catalog import Catalog
+
+    monkeypatch.setattr(db_utils, "DB_PATH", db_dir)
+    catalog = Catalog("products", "products", db_utils.PRODUCT_COLUMNS, db_utils._product)
+    with pytest.raises(RuntimeError, match="migrate_db"):
+        catalog.snapshot()
+
+    migrate(db_dir, verbose=False)
+    version = catalog.version()
+    with sqlite3.connect(db_dir / "products.db") as conn:
+        conn.execute("UPDATE products SET price = price + 1 WHERE id = 2")
+    assert catalog.version() == version + 1
@@ -0,0 +1,31 @@
+# python-server/tests/test_model_registry.py
+import pytest
+
+from src.utils.compiled_forest import CompiledForest
+from src.utils.linear_model import LinearSoftmax
+from src.utils.model_registry import publish_version
+
+def contents(directory):
+    return {path.relative_to(directory): path.read_bytes() for path in sorted(directory.rglob("*")) if path.is_file()}
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_published_version_survives_a_new_export(digits, tmp_path):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    train, labels, _ = digits
+    store = tmp_path / "store"
+
+    def export(seed):
+        forest = RandomForestClassifier(n_estimators=5, random_state=seed, n_jobs=1).fit(train, labels)
+        linear = LogisticRegression(max_iter=50 + seed).fit(train, labels)
+        return [CompiledForest.from_sklearn(forest).save("RandomForest", store),
+                LinearSoftmax.from_sklearn(linear).save(tmp_path / "LogisticRegression.npz")]
+
+    v1 = publish_version("Model", export(0), models_dir=tmp_path, version="v1")
+    published = contents(v1)
+    assert published
+
+    # Retrain and export again into the same working files
+    export(1)
+    assert contents(v1) == published
@@ -0,0 +1,92 @@
+# python-server/tests/test_predict_number.py
+import numpy as np
+import pytest
+from flask import Flask
+
+from src.utils.predict_number import predict_number_from_request
+
+class FixedModel:
+    """Model that predicts the same digit for every input."""
+
+    def __init__(self, digit: int):
+        self.model_name = f"fixed_{digit}"
+        self.digit = digit
+
+    def predict_proba(self, data):
+        probabilities = np.zeros((len(data), 10))
+        probabilities[:, self.digit] = 1.0
+        return probabilities
+
+class BrokenModel:
+    """Model whose prediction fails."""
+
+    model_name = "broken"
+
+    def predict_proba(self, data):
+        raise RuntimeError("out of memory")
+
+class Registry(dict):
+    """Models keyed by name, `active` fails for models that cannot be loaded."""
+
+    def active(self, name):
+        model = self[name]
+        if model is None:
+            raise OSError("file not found")
+        return model, "v1"
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+@pytest.fixture
+def payload():
+    pixels = np.zeros((28, 28), dtype=np.uint8)
+    pixels[6:22, 12:16] = 255
+    return {"pixels": pixels.tolist()}
+
+def predict(payload, registry, **fields):
+    response, status = predict_number_from_request({**payload, **fields}, registry)
+    return response.get_json(), status
+
+def test_unknown_model_is_a_bad_request(app, payload):
+    body, status = predict(payload, Registry(a=FixedModel(3)), model="missing")
+    assert status == 400
+    assert "missing" in body["error"]
+
+def test_unknown_ensemble_member_is_a_bad_request(app, payload):
+    models = Registry(a=FixedModel(3), b=FixedModel(5))
+    assert predict(payload, models, model="ensemble", models=["a", "missing"])[1] == 400
+    assert predict(payload, models, model="ensemble", weights={"missing": 1})[1] == 400
+
+def test_ensemble_combines_the_selected_models(app, payload):
+    models = Registry(a=FixedModel(3), b=FixedModel(5), c=FixedModel(7))
+    body, status = predict(payload, models, model="ensemble", models=["a", "b"], weights={"b": 3})
+    assert status == 200
+    assert body["predicted_digit"] == 5
+    assert body["confidence"] == pytest.approx(0.75)
+    assert set(body["models"]) == {"a", "b"}
+    assert body["failed"] == {}
+
+def test_ensemble_leaves_out_failed_models(app, payload):
+    models = Registry(a=FixedModel(3), broken=BrokenModel(), unloadable=None)
+    body, status = predict(payload, models, model="ensemble")
+    assert status == 200
+    assert body["predicted_digit"] == 3
+    assert body["confidence"] == pytest.approx(1.0)
+    assert list(body["models"]) == ["a"]
+    assert set(body["failed"]) == {"broken", "unloadable"}
+
+def test_ensemble_fails_if_no_model_predicts(app, payload):
+    models = Registry(broken=BrokenModel(), unloadable=None)
+    body, status = predict(payload, models, model="ensemble")
+    assert status == 503
+    assert set(body["failed"]) == {"broken", "unloadable"}
+
+@pytest.mark.parametrize("weight", ["nan", "inf", float("nan")])
+def test_non_finite_weight_is_a_bad_request(app, payload, weight):
+    models = Registry(a=FixedModel(3), b=FixedModel(5))
+    body, status = predict(payload, models, model="ensemble", weights={"a": weight})
+    assert status == 400
+    assert "finite" in body["error"]
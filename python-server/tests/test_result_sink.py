@@ -0,0 +1,37 @@
+# python-server/tests/test_result_sink.py
+from src.utils.result_sink import ResultSink
+
+def record(label, predicted=3, confidence=0.9):
+    return {"ts": 0.0, "label": label, "predicted": predicted, "confidence": confidence}
+
+def test_writer_survives_a_bad_record(tmp_path):
+    sink = ResultSink(tmp_path, flush_lines=1, flush_interval=0.01, verbose=False)
+    sink.write("model", {"ts": 0.0})  # No label, format_line raises KeyError
+    sink.flush()
+    sink.write("model", record(7))
+    sink.flush()
+
+    assert sink._writer.is_alive()
+    assert sink.stats()["failed"] == 1
+    assert (tmp_path / "model_result.log").read_text() == "7, 3, 0.9\n"
+
+class BrokenSink(ResultSink):
+    """Sink whose first batch fails with an unexpected error."""
+
+    def _flush(self, pending):
+        if not getattr(self, "broke", False):
+            self.broke = True
+            raise RuntimeError("disk on fire")
+        super()._flush(pending)
+
+def test_writer_survives_a_failed_batch(tmp_path):
+    sink = BrokenSink(tmp_path, flush_lines=1, flush_interval=0.01, verbose=False)
+    sink.write("model", record(1))
+    sink.flush()
+    sink.write("model", record(2))
+    sink.flush()
+
+    assert sink._writer.is_alive()
+    assert sink.stats()["failed"] == 1
+    assert sink.stats()["written"] == 1
+    assert (tmp_path / "model_result.log").read_text() == "2, 3, 0.9\n"
@@ -0,0 +1,35 @@
+# python-server/tests/test_search.py
+from src.utils.db_utils import search_products
+
+def ids(products):
+    return [product["id"] for product in products]
+
+def test_pages_run_through_all_matches(products_db):
+    matches = ids(search_products("a", limit=1000))
+    assert len(matches) > 3
+
+    pages = []
+    for offset in range(0, len(matches), 3):
+        pages += ids(search_products("a", limit=3, offset=offset))
+    assert pages == matches
+
+def test_numeric_query_puts_the_id_first(products_db):
+    assert ids(search_products("10"))[0] == 10
+
+def test_short_query_folds_non_ascii_case(products_db):
+    assert ids(search_products("Å")) == [2, 3, 4, 12]
+    assert ids(search_products("å")) == [2, 3, 4, 12]
+
+def test_index_folds_non_ascii_case(products_db):
+    assert ids(search_products("SKÅL")) == ids(search_products("skål")) == [2, 3, 4, 12]
+
+def test_short_query_is_not_a_pattern(products_db):
+    assert search_products("%") == []
+    assert search_products("_") == []
+
+def test_non_ascii_digit_is_text(products_db):
+    assert search_products("²") == []
+
+def test_number_beyond_sqlite_integers_is_text(products_db):
+    assert search_products("99999999999999999999") == []
+    assert search_products(str(2**63 - 1)) == []